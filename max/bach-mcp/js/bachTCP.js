@@ -1,4 +1,5 @@
 const net = require('net');
+const fs = require('fs');
 const EventEmitter = require('events');
 const path = require('path');
 const Max = require('max-api');
@@ -11,10 +12,12 @@ const CLIENT_PORT = 3001;
 Max.post(`Loaded ${path.basename(__filename)}`);
 
 class MaxTCPServer extends EventEmitter {
-  constructor(host = SERVER_HOST, port = SERVER_PORT) {
+  constructor(host = SERVER_HOST, port = SERVER_PORT, socketPath = null) {
     super();
     this.host = host;
     this.port = port;
+    // Unix domain socket path; when set, host/port are ignored.
+    this.socketPath = socketPath;
     this.server = null;
     this.clients = new Map();
     this.clientCounter = 0;
@@ -30,7 +33,7 @@ class MaxTCPServer extends EventEmitter {
     this.server = net.createServer((socket) => {
       this.clientCounter += 1;
       const clientId = this.clientCounter;
-      const clientAddress = `${socket.remoteAddress}:${socket.remotePort}`;
+      const clientAddress = this.socketPath || `${socket.remoteAddress}:${socket.remotePort}`;
 
       this.clients.set(clientId, {
         socket: socket,
@@ -41,16 +44,27 @@ class MaxTCPServer extends EventEmitter {
 
       this.emit('clientConnected', { id: clientId, address: clientAddress });
 
+      // Python frames every message with a newline and may send several in
+      // one write (batches), while TCP may split or merge them arbitrarily.
+      // Keep the unterminated tail and emit each complete line on its own.
+      let pending = '';
+      // Decode in the stream so multi-byte characters split across chunks survive.
+      socket.setEncoding('utf8');
       socket.on('data', (data) => {
-        const message = data.toString('utf8').trim();
-        if (!message) {
-          return;
-        }
-        this.broadcast(`${message}\n`, clientId);
-        this.emit('message', {
-          clientId: clientId,
-          address: clientAddress,
-          message: message,
+        pending += data;
+        const lines = pending.split('\n');
+        pending = lines.pop();
+        lines.forEach((line) => {
+          const message = line.trim();
+          if (!message) {
+            return;
+          }
+          this.broadcast(`${message}\n`, clientId);
+          this.emit('message', {
+            clientId: clientId,
+            address: clientAddress,
+            message: message,
+          });
         });
       });
 
@@ -70,10 +84,16 @@ class MaxTCPServer extends EventEmitter {
       }
     });
 
-    this.server.listen(this.port, this.host, () => {
+    const onListening = () => {
       this.listening = true;
       this.emit('started');
-    });
+    };
+    if (this.socketPath) {
+      removeStaleSocket(this.socketPath);
+      this.server.listen(this.socketPath, onListening);
+    } else {
+      this.server.listen(this.port, this.host, onListening);
+    }
   }
 
   broadcast(message, excludeClientId = null) {
@@ -112,6 +132,7 @@ class MaxTCPServer extends EventEmitter {
       listening: this.listening,
       host: this.host,
       port: this.port,
+      socketPath: this.socketPath,
       clientCount: this.clients.size,
       clients: this.getClients(),
     };
@@ -135,10 +156,11 @@ class MaxTCPServer extends EventEmitter {
 }
 
 class MaxTCPClient extends EventEmitter {
-  constructor(host = CLIENT_HOST, port = CLIENT_PORT) {
+  constructor(host = CLIENT_HOST, port = CLIENT_PORT, socketPath = null) {
     super();
     this.host = host;
     this.port = port;
+    this.socketPath = socketPath;
     this.socket = null;
     this.connected = false;
     this.reconnectAttempts = 0;
@@ -151,11 +173,14 @@ class MaxTCPClient extends EventEmitter {
       this.socket.destroy();
     }
 
-    this.socket = net.createConnection(this.port, this.host, () => {
+    const onConnect = () => {
       this.connected = true;
       this.reconnectAttempts = 0;
       this.emit('connected');
-    });
+    };
+    this.socket = this.socketPath
+      ? net.createConnection(this.socketPath, onConnect)
+      : net.createConnection(this.port, this.host, onConnect);
 
     this.socket.on('data', (data) => {
       const message = data.toString('utf8').trim();
@@ -173,7 +198,8 @@ class MaxTCPClient extends EventEmitter {
     this.socket.on('error', (err) => {
       this.connected = false;
       this.emit('error', err);
-      if (err.code === 'ECONNREFUSED') {
+      // ENOENT: the Python side has not created its Unix socket yet.
+      if (err.code === 'ECONNREFUSED' || err.code === 'ENOENT') {
         this.attemptReconnect();
       }
     });
@@ -211,6 +237,17 @@ class MaxTCPClient extends EventEmitter {
   }
 }
 
+function removeStaleSocket(socketPath) {
+  // A socket file left by an earlier run makes listen() fail with EADDRINUSE.
+  try {
+    if (fs.statSync(socketPath).isSocket()) {
+      fs.unlinkSync(socketPath);
+    }
+  } catch (err) {
+    // Nothing to remove.
+  }
+}
+
 function formatMaxAtom(value) {
   if (Array.isArray(value)) {
     return `[ ${value.map(formatMaxAtom).join(' ')} ]`;
@@ -313,6 +350,19 @@ Max.addHandler('reconnectTo', (host, port) => {
   const actualPort = port || CLIENT_PORT;
   global.maxTCPClient.host = actualHost;
   global.maxTCPClient.port = actualPort;
+  global.maxTCPClient.socketPath = null;
+  global.maxTCPClient.reconnectAttempts = 0;
+  global.maxTCPClient.connect();
+});
+
+// Same machine only: reach Python over a Unix domain socket instead of TCP.
+// Must match MCPConfig.incoming_socket_path on the Python side.
+Max.addHandler('reconnectToSocket', (socketPath) => {
+  if (!socketPath) {
+    Max.post('[Bach TCP Client] reconnectToSocket: No socket path provided');
+    return;
+  }
+  global.maxTCPClient.socketPath = String(socketPath);
   global.maxTCPClient.reconnectAttempts = 0;
   global.maxTCPClient.connect();
 });
@@ -375,4 +425,21 @@ Max.addHandler('startServer', (host, port) => {
   global.maxTCPServer = new MaxTCPServer(actualHost, actualPort);
 });
 
+// Listen for Python on a Unix domain socket; send stopServer first if the TCP
+// server is running. Must match MCPConfig.outgoing_socket_path.
+Max.addHandler('startServerOnSocket', (socketPath) => {
+  if (!socketPath) {
+    Max.post('[Bach TCP Server] startServerOnSocket: No socket path provided');
+    return;
+  }
+  if (global.maxTCPServer.listening) {
+    Max.post('[Bach TCP Server] Server already running');
+    return;
+  }
+  // Reuse the existing instance so the event handlers above stay attached.
+  Max.post(`[Bach TCP Server] Starting server on ${socketPath}`);
+  global.maxTCPServer.socketPath = String(socketPath);
+  global.maxTCPServer.start();
+});
+
 Max.post('[Bach TCP] Combined server/client ready for Max MSP communication');
@@ -5,14 +5,35 @@ breakpoints, and orchestral layout reference are all documented in BACH_SKILL.md
 Read that skill at the start of every session before taking any action.
 """
 
+import asyncio
+import atexit
+import base64
 import functools
+import inspect
+import json
 import logging
 import os
-from typing import Any, Dict, Optional
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from mcp.server.fastmcp import FastMCP
 
-from .server import BachMCPServer
+from .server import BachMCPServer, _log
+
+try:  # optional: faster memory.json reads and writes
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # optional: SIMD base64 for score_snapshot images
+    import pybase64
+except ImportError:
+    pybase64 = None
 
 _tool_log = logging.getLogger("bach.tools")
 
@@ -38,10 +59,310 @@ def _format_call_args(kwargs: Dict[str, Any]) -> str:
     return ", ".join(f"{k}={_truncate(repr(v), 120)}" for k, v in kwargs.items())
 
 
+def _as_int(x: Any) -> int:
+    """int(x), skipping the constructor call when x already is one (the usual case)."""
+    return x if type(x) is int else int(x)
+
+
+def _as_float(x: Any) -> float:
+    """float(x), skipping the constructor call when x already is one (the usual case)."""
+    return x if type(x) is float else float(x)
+
+
+# Every byte value except "[" and "]"; deleting them from the UTF-8 encoding leaves
+# the bare bracket skeleton (multi-byte characters never contain those two bytes).
+_LLLL_NON_BRACKET_BYTES = bytes(b for b in range(256) if b not in b"[]")
+
+# Depth step per skeleton byte, indexed by byte value: +1 for "[", -1 for "]".
+_LLLL_BRACKET_STEP = tuple(1 if b == 0x5B else -1 if b == 0x5D else 0 for b in range(256))
+
+# Characters that never appear in llll. Angle brackets are deliberately absent:
+# hairpins in dynamics slots ("p<", "f>") are legitimate.
+_LLLL_ILLEGAL_CHARS = "{}"
+_LLLL_ILLEGAL_TABLE = str.maketrans("", "", _LLLL_ILLEGAL_CHARS)
+
+# Leading "roll" keyword of a score message, matched without lowercasing the whole score.
+_ROLL_PREFIX_RE = re.compile(r"roll", re.IGNORECASE)
+
+
+def _err_unexpected_close(s: str) -> str:
+    """Locate the first ']' that drives the depth negative and describe it.
+
+    Only called once the bracket counts have shown the depth does go negative,
+    so the per-character walk and message formatting stay off the happy path.
+    """
+    depth = 0
+    for i, ch in enumerate(s):
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth < 0:
+                break
+    # Find context around the error
+    snippet = s[max(0, i - 20) : i + 20].replace("\n", " ")
+    return (
+        f"llll validation error: unexpected closing bracket ']' at position {i} "
+        f"(depth went negative). Context: '...{snippet}...'"
+    )
+
+
+def _check_llll(s: str) -> Optional[str]:
+    """Validate a raw llll string for structural correctness.
+
+    Returns None if the string is valid, or a descriptive error message if not.
+
+    Checks performed:
+    - Balanced square brackets (no unclosed or extra closing brackets)
+    - No empty outermost string (caller should guard for this separately)
+    - No illegal characters that have no meaning in llll (curly braces)
+    - Bracket depth never goes negative (extra closing bracket)
+    - Warns about suspiciously unbalanced nesting depth anomalies
+
+    Does NOT validate semantic correctness (e.g. correct pitch values, onset ordering).
+    That remains the responsibility of bach.roll itself.
+
+    The scan runs in C. Bracket counts settle most cases on their own: more
+    closers than openers means the depth went negative, no closers at all means
+    it cannot have. Otherwise the string is reduced to its bracket skeleton with
+    one bytes.translate pass, and the running depth over that skeleton is summed
+    by accumulate in a single linear pass; a negative minimum means the depth
+    went negative.
+    """
+    opens = s.count("[")
+    closes = s.count("]")
+    if closes > opens:
+        # More closers than openers: the depth must go negative somewhere.
+        went_negative = True
+    elif closes:
+        skeleton = s.encode("utf-8", "surrogatepass").translate(None, _LLLL_NON_BRACKET_BYTES)
+        went_negative = min(accumulate(map(_LLLL_BRACKET_STEP.__getitem__, skeleton))) < 0
+    else:
+        went_negative = False
+    if went_negative:
+        return _err_unexpected_close(s)
+    if opens != closes:
+        return (
+            f"llll validation error: {opens - closes} unclosed bracket(s) '[' remain at end of string. "
+            f"Every '[' must have a matching ']'."
+        )
+    # Check for characters that are never valid in llll
+    if len(s.translate(_LLLL_ILLEGAL_TABLE)) != len(s):
+        found_illegal = set(_LLLL_ILLEGAL_CHARS).intersection(s)
+        chars = ", ".join(f"'{c}'" for c in sorted(found_illegal))
+        return (
+            f"llll validation error: illegal character(s) found: {chars}. "
+            f"llll only uses square brackets [ ] for grouping."
+        )
+    return None  # all checks passed
+
+
+# Brackets and bare non-negative integers of a count reply; symbols such as the
+# leading "numnotes" or a query label are skipped.
+_LLLL_INT_TOKEN_RE = re.compile(r"[\[\]]|(?<![\w.\-])\d+(?![\w.])")
+
+
+def _parse_llll_ints(s: str) -> List[Any]:
+    """Parse the integers of an llll reply into nested lists, keeping its bracket structure.
+
+    "[3 4 2] [1 5]" -> [[3, 4, 2], [1, 5]]. Meant for count queries (getnumnotes,
+    getnumchords); anything that is not a bracket or an integer is ignored.
+    """
+    root: List[Any] = []
+    stack = [root]
+    for token in _LLLL_INT_TOKEN_RE.findall(s):
+        if token == "[":
+            child: List[Any] = []
+            stack[-1].append(child)
+            stack.append(child)
+        elif token == "]":
+            if len(stack) > 1:
+                stack.pop()
+        else:
+            stack[-1].append(int(token))
+    return root
+
+
+def _sum_nested(values: List[Any]) -> int:
+    return sum(_sum_nested(v) if isinstance(v, list) else v for v in values)
+
+
+# One pass over a full llll reply: brackets, double-quoted symbols (which may hold
+# spaces) and bare atoms. Atoms that look like numbers become int/float.
+_LLLL_TOKEN_RE = re.compile(r'(?P<open>\[)|(?P<close>\])|"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<atom>[^\s\[\]"]+)')
+_LLLL_INT_RE = re.compile(r"[+-]?\d+")
+_LLLL_FLOAT_RE = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?")
+
+
+def _parse_llll(s: str) -> List[Any]:
+    """Parse an llll reply into nested lists of ints, floats and symbol strings.
+
+    "roll [ [ 0. [ 6000. 500. 100 0 ] 0 ] ]" -> ["roll", [[0.0, [6000.0, 500.0, 100, 0], 0]]].
+    Rationals such as 1/8 and pitch names stay symbols; unbalanced closing
+    brackets are ignored rather than raised, as in _parse_llll_ints.
+    """
+    root: List[Any] = []
+    stack = [root]
+    for match in _LLLL_TOKEN_RE.finditer(s):
+        kind = match.lastgroup
+        if kind == "open":
+            child: List[Any] = []
+            stack[-1].append(child)
+            stack.append(child)
+        elif kind == "close":
+            if len(stack) > 1:
+                stack.pop()
+        elif kind == "quoted":
+            stack[-1].append(match.group("quoted"))
+        else:
+            atom = match.group("atom")
+            if _LLLL_INT_RE.fullmatch(atom):
+                stack[-1].append(int(atom))
+            elif _LLLL_FLOAT_RE.fullmatch(atom):
+                stack[-1].append(float(atom))
+            else:
+                stack[-1].append(atom)
+    return root
+
+
+# Slot, breakpoint and chord fragments repeat heavily across calls; whole scores
+# rarely do, so only strings up to this length get the large cache. Longer ones
+# keep just the last input, which covers a retried send of the same score.
+_LLLL_CACHE_MAX_LEN = 8192
+_check_llll_cached = functools.lru_cache(maxsize=4096)(_check_llll)
+_check_long_llll_cached = functools.lru_cache(maxsize=1)(_check_llll)
+
+
+def _validate_llll(s: str) -> Optional[str]:
+    """Validate a raw llll string (see _check_llll), memoizing the result."""
+    if len(s) > _LLLL_CACHE_MAX_LEN:
+        return _check_long_llll_cached(s)
+    return _check_llll_cached(s)
+
+
+# Complete sel commands for the whole-category selections, which need no validation.
+_SEL_CATEGORY_COMMANDS = {
+    category: f"sel {category}"
+    for category in ("all", "notes", "chords", "markers", "breakpoints", "tails")
+}
+
+# A conditional selection ("note if", "chord if", ...) with nothing after the "if".
+_SEL_EMPTY_CONDITION_RE = re.compile(r"(?:note|chord|marker|breakpoint|tail)\s+if$", re.IGNORECASE)
+
+# Complete legato commands and glissando prefixes for the documented modes, looked
+# up before any stripping; other tokens are formatted on demand.
+_LEGATO_COMMANDS = {"": "legato", "trim": "legato trim", "extend": "legato extend"}
+_GLISSANDO_PREFIXES = {"": "glissando", "trim": "glissando trim", "extend": "glissando extend"}
+
+# Attributes documented in set_appearance(); anything else is rejected before it reaches Max.
+# Each maps to its "<attribute> " command prefix, so a call only appends the value.
+_APPEARANCE_PREFIXES = {attribute: f"{attribute} " for attribute in (
+    "bgcolor", "notecolor", "staffcolor",
+    "ruler", "rulercolor", "rulerlabels", "rulerlabelsfontsize", "rulermode",
+    "scrollbarcolor", "showscrollbar", "showvscrollbar",
+    "selectedlegendcolor", "selectioncolor",
+    "showaccidentalspreferences",
+    "showannotations", "showarticulations", "showarticulationsextensions", "showauxclefs",
+    "showborder", "showclefs", "showdurations", "showdynamics", "showfocus", "showhairpins",
+    "showledgerlines", "showlyrics", "showmarkers", "shownotenames", "showpartcolors",
+    "showplayhead", "showslotlabels", "showslotlegend", "showslotnumbers", "showsolocolor",
+    "showstems", "showtails", "showvoicenames",
+    "showgroups", "showvelocity",
+    "stemcolor", "subdivisiongridcolor",
+    "voicenamesalign", "voicenamesfont", "voicenamesfontsize", "voicespacing",
+    "vzoom", "zoom",
+)}
+
+
+# exportmidi attributes at their tool defaults, the usual case.
+_EXPORTMIDI_DEFAULT_ATTRS = (
+    "[exportmarkers 1] [exportbarlines 1] [exportdivisions 1] [exportsubdivisions 1] "
+    "[format 1] [resolution 960]"
+)
+
+
+# new_default_score() steps as (result key, command), in the order Max applies them.
+_DEFAULT_SCORE_STEPS = (
+    ("clear", "clear"),                                  # all content
+    ("numvoices", "numvoices 1"),                        # single voice
+    ("clefs", "clefs G"),                                # treble clef
+    ("stafflines", "stafflines 5"),                      # standard 5-line staff
+    ("numparts", "numparts 1"),                          # voice 1 alone on its staff
+    ("bgcolor", "bgcolor 1.0 1.0 1.0 1.0"),              # white background
+    ("notecolor", "notecolor 0.0 0.0 0.0 1.0"),          # black notes
+    ("staffcolor", "staffcolor 0.0 0.0 0.0 1.0"),        # black staff lines
+    ("voicenames", "voicenames"),                        # no voice name label
+    ("domain", "domain 10000.0"),                        # 10-second visible domain
+)
+_DEFAULT_SCORE_COMMANDS = [command for _, command in _DEFAULT_SCORE_STEPS]
+
+
+# Commands an open begin_batch() collects before sending them early.
+_COMMAND_BATCH_MAX = 64
+# An open batch that gets no new command for this long is sent and closed, so a
+# batch the agent never ends cannot hold back every later command.
+_COMMAND_BATCH_IDLE_SECONDS = 2.0
+
+
+# Slot types documented in define_slot(), each mapped to its " [type <t>]" slotinfo
+# fragment; any other type is rejected before it reaches Max.
+_SLOT_TYPE_FRAGMENTS = {slot_type: f" [type {slot_type}]" for slot_type in (
+    "function", "int", "float", "intlist", "floatlist", "text", "llll", "filelist",
+    "spat", "color", "filter", "dynfilter", "3dfunction",
+    "articulations", "notehead", "dynamics",
+    "togglematrix", "intmatrix", "floatmatrix",
+)}
+
+
+# Fixed error responses, built once and shared. Tool results are only ever
+# serialized, never mutated, so handing out the same dict is safe.
+_ERR_EMPTY_COMMAND = {"ok": False, "message": "Rejected empty process message"}
+_ERR_SEND_FAILED = {"ok": False, "message": "Failed to send process message to Max"}
+_ERR_DURATION = {"ok": False, "message": "duration_ms must be > 0"}
+_ERR_VELOCITY = {"ok": False, "message": "velocity must be between 0 and 127"}
+_ERR_VOICE = {"ok": False, "message": "voice must be > 0"}
+_ERR_SCORE_SEND_FAILED = {"ok": False, "message": "Failed to send llll score to Max"}
+_ERR_NO_COMMAND_BATCH = {"ok": False, "message": "No command batch is open; call begin_batch() first"}
+_ERR_EMPTY_CLEFS_LIST = {"ok": False, "message": "clefs_list cannot be empty"}
+_ERR_EMPTY_PARTS = {"ok": False, "message": "parts cannot be empty"}
+_ERR_COUNT = {"ok": False, "message": "count must be > 0"}
+_ERR_EMPTY_VALUE = {"ok": False, "message": "value cannot be empty"}
+_ERR_EMPTY_POSITION = {"ok": False, "message": "position cannot be empty"}
+_ERR_EMPTY_NAME_OR_NAMES = {"ok": False, "message": "name_or_names cannot be empty"}
+_ERR_EMPTY_MARKERS = {"ok": False, "message": "markers cannot be empty"}
+_ERR_EMPTY_MARKER_NAMES = {"ok": False, "message": "marker_names cannot be empty"}
+_ERR_VOICE_NUMBER = {"ok": False, "message": "voice_number must be > 0"}
+_ERR_NO_NUMNOTES_REPLY = {"ok": False, "message": "No response from Max to getnumnotes"}
+_ERR_NO_SUBROLL_REPLY = {"ok": False, "message": "No response from Max to subroll"}
+_ERR_EMPTY_VOICES = {"ok": False, "message": "voices cannot be empty"}
+_ERR_EMPTY_ARGUMENTS = {"ok": False, "message": "arguments cannot be empty"}
+_ERR_SEL_EMPTY_CONDITION = {"ok": False, "message": "Invalid sel arguments — 'if' needs a condition"}
+_ERR_SLOT_NUMBER = {"ok": False, "message": "slot_number must be > 0"}
+_ERR_NO_SLOTINFO_FIELDS = {"ok": False, "message": "No slotinfo fields specified"}
+_ERR_EMPTY_SLOT = {"ok": False, "message": "slot cannot be empty"}
+_ERR_EMPTY_ATTRIBUTE = {"ok": False, "message": "attribute cannot be empty"}
+_ERR_EMPTY_CHORD_LLLL = {"ok": False, "message": "chord_llll cannot be empty"}
+_ERR_EMPTY_CHORDS_LLLL = {"ok": False, "message": "chords_llll cannot be empty"}
+_ERR_EMPTY_CHORD_LIST = {"ok": False, "message": "chord_lllls cannot be empty"}
+_ERR_EMPTY_SLOT_OR_POSITION = {"ok": False, "message": "slot and position cannot be empty"}
+_ERR_VOICENAMES_UNCLOSED_QUOTE = {"ok": False, "message": "Invalid voicenames value — unclosed double quote"}
+
+# Fixed success responses, shared the same way.
+_OK_COMMAND_BATCH_STARTED = {"ok": True, "message": "Command batch started"}
+_OK_COMMAND_BATCH_EMPTY = {"ok": True, "message": "Command batch closed; nothing was queued"}
+
+
 def create_mcp_app(bach: BachMCPServer) -> FastMCP:
     """Create and configure MCP tools/resources for bridge communication."""
     mcp = FastMCP("bach")
 
+    # Bound once: every tool call goes through these, so skip the attribute
+    # lookup on `bach` per call.
+    _send_info = bach.send_info
+    _send_info_batch = bach.send_info_batch
+    _send_score_now = bach.send_score
+    _wait_for_incoming = bach.wait_for_incoming_async
+
     # Wrap mcp.tool so every registered tool logs its name, arguments, and result
     # in a human-readable form. Toggle off with BACH_TOOL_LOG=0.
     if os.getenv("BACH_TOOL_LOG", "1") != "0":
@@ -52,6 +373,23 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
             decorator = _register_tool(*d_args, **d_kwargs)
 
             def wrap(fn):
+                # Query tools are coroutines; their wrapper must be one too so
+                # FastMCP still awaits them.
+                if inspect.iscoroutinefunction(fn):
+
+                    @functools.wraps(fn)
+                    async def logged_async(*args: Any, **kwargs: Any):
+                        _tool_log.info("→ %s(%s)", fn.__name__, _format_call_args(kwargs))
+                        try:
+                            result = await fn(*args, **kwargs)
+                        except Exception as exc:  # noqa: BLE001 — log then re-raise
+                            _tool_log.info("✗ %s raised %s: %s", fn.__name__, type(exc).__name__, exc)
+                            raise
+                        _tool_log.info("← %s  %s", fn.__name__, _truncate(repr(result), 200))
+                        return result
+
+                    return decorator(logged_async)
+
                 @functools.wraps(fn)
                 def logged(*args: Any, **kwargs: Any):
                     _tool_log.info("→ %s(%s)", fn.__name__, _format_call_args(kwargs))
@@ -69,70 +407,179 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
 
         mcp.tool = _logging_tool  # type: ignore[method-assign]
 
-    def _send_max_message(command: str) -> Dict[str, Any]:
-        command = command.strip()
+    # Commands collected between begin_batch() and end_batch(), sent to Max in
+    # a single write. None means no batch is open and every command goes out at once.
+    # The idle timer closes it from another thread, so the batch and the timer are
+    # only touched under _command_batch_lock.
+    _command_batch: Optional[List[str]] = None
+    _command_batch_timer: Optional[threading.Timer] = None
+    _command_batch_lock = threading.RLock()
+
+    # Recent replies to the count queries (getnumvoices, getnumchords, getnumnotes),
+    # keyed by command as (monotonic time, reply). Agents re-check these several
+    # times per turn; any command sent to Max may change them, so every send clears it.
+    _QUERY_CACHE_TTL_SECONDS = 0.2
+    _QUERY_CACHE_MAX_ENTRIES = 256
+    _query_cache: Dict[str, Tuple[float, str]] = {}
+    # subroll replies, kept apart because they also carry header data (voicenames,
+    # stafflines) that layout-only commands change. Their keys are open-ended, so
+    # the oldest entry goes once the cache is full.
+    _subroll_cache: Dict[str, Tuple[float, str]] = {}
+
+    # Last value sent for each set_appearance() attribute, as (monotonic time, value).
+    # Re-sending the same value within the window is skipped; the window is short
+    # because the attribute can also be changed from the Max window.
+    _APPEARANCE_REPEAT_SECONDS = 1.0
+    _appearance_sent: Dict[str, Tuple[float, str]] = {}
+
+    def _note_appearance(commands: List[str], written: bool = True) -> None:
+        # Record appearance commands from every send path once they have been
+        # written to Max. A command that is only queued drops the attribute's
+        # record instead: until the batch goes out, Max's value is not known.
+        for command in commands:
+            attribute, _, value = command.partition(" ")
+            if attribute in _APPEARANCE_PREFIXES:
+                if written:
+                    _appearance_sent[attribute] = (time.monotonic(), value)
+                else:
+                    _appearance_sent.pop(attribute, None)
+
+    async def _cached_query(
+        command: str,
+        timeout_seconds: float,
+        cache: Dict[str, Tuple[float, str]] = _query_cache,
+    ) -> str:
+        hit = cache.get(command)
+        if hit is not None and time.monotonic() - hit[0] < _QUERY_CACHE_TTL_SECONDS:
+            return hit[1]
+        result = await _request_max_and_wait(command, timeout_seconds=timeout_seconds)
+        if result:
+            if len(cache) >= _QUERY_CACHE_MAX_ENTRIES:
+                del cache[next(iter(cache))]
+            cache[command] = (time.monotonic(), result)
+        return result
+
+    def _send_score(score_llll: str) -> bool:
+        _query_cache.clear()
+        _subroll_cache.clear()
+        # Scores join an open command batch so they reach Max in call order.
+        with _command_batch_lock:
+            if _command_batch is not None:
+                return _queue_commands([score_llll])
+        return _send_score_now(score_llll)
+
+    def _queue_commands(commands: List[str]) -> bool:
+        # Append to the open batch. A batch that reaches _COMMAND_BATCH_MAX goes
+        # out early so a long session never holds an unbounded frame; it stays open.
+        # If that early send fails, the new commands are taken back out so the
+        # caller's failure is accurate, and everything queued before them is kept.
+        # Caller holds _command_batch_lock.
+        _command_batch.extend(commands)
+        if len(_command_batch) >= _COMMAND_BATCH_MAX and not _flush_command_batch():
+            del _command_batch[-len(commands):]
+            return False
+        _restart_command_batch_timer()
+        return True
+
+    def _flush_command_batch() -> bool:
+        # Send whatever the open batch holds so far; the batch stays open. The
+        # queued commands are only dropped once the write succeeded.
+        with _command_batch_lock:
+            if not _command_batch:
+                return True
+            if not _send_info_batch(_command_batch):
+                return False
+            _note_appearance(_command_batch)
+            _command_batch.clear()
+            return True
+
+    def _restart_command_batch_timer() -> None:
+        """(Re)start the idle timer of the open batch. Caller holds _command_batch_lock."""
+        nonlocal _command_batch_timer
+        if _command_batch_timer is not None:
+            _command_batch_timer.cancel()
+        _command_batch_timer = threading.Timer(_COMMAND_BATCH_IDLE_SECONDS, _close_idle_command_batch)
+        _command_batch_timer.daemon = True
+        _command_batch_timer.start()
+
+    def _close_command_batch() -> None:
+        """Close the open batch without sending it. Caller holds _command_batch_lock."""
+        nonlocal _command_batch, _command_batch_timer
+        if _command_batch_timer is not None:
+            _command_batch_timer.cancel()
+            _command_batch_timer = None
+        _command_batch = None
+
+    def _close_idle_command_batch() -> None:
+        # Timer thread: send what the idle batch holds and close it. If the send
+        # fails the batch stays open, so its commands are kept for end_batch().
+        with _command_batch_lock:
+            if _command_batch is None:
+                return
+            pending = len(_command_batch)
+            if not _flush_command_batch():
+                _log(f"Failed to send {pending} idle batched command(s) to Max; batch left open")
+                return
+            _close_command_batch()
+
+    def _send_max_message(command: str, changes_counts: bool = True) -> Dict[str, Any]:
+        # Every tool strips its own arguments before building `command`, so it
+        # arrives clean; raw user input goes through send_process_message_to_max.
+        # Layout-only commands pass changes_counts=False to keep cached count replies.
         if not command:
-            return {"ok": False, "message": "Rejected empty process message"}
-        success = bach.send_info(command)
+            return _ERR_EMPTY_COMMAND
+        if changes_counts:
+            _query_cache.clear()
+        _subroll_cache.clear()
+        with _command_batch_lock:
+            if _command_batch is not None:
+                _note_appearance([command], written=False)
+                if not _queue_commands([command]):
+                    return _ERR_SEND_FAILED
+                return {"ok": True, "message": f"Queued: {command}"}
+        success = _send_info(command)
         if not success:
-            return {"ok": False, "message": "Failed to send process message to Max"}
-        return {"ok": True, "sent_message": command}
-
-    def _request_max_and_wait(command: str, timeout_seconds: float = 15.0) -> str:
+            return _ERR_SEND_FAILED
+        _note_appearance([command])
+        return {"ok": True, "message": command}
+
+    def _send_max_messages(commands: List[str]) -> Dict[str, Any]:
+        # Several ready-built commands in one write (or appended to an open batch).
+        _query_cache.clear()
+        _subroll_cache.clear()
+        with _command_batch_lock:
+            if _command_batch is not None:
+                _note_appearance(commands, written=False)
+                if not _queue_commands(commands):
+                    return _ERR_SEND_FAILED
+                return {"ok": True, "message": f"Queued {len(commands)} command(s)"}
+        if not _send_info_batch(commands):
+            return _ERR_SEND_FAILED
+        _note_appearance(commands)
+        return {"ok": True, "message": f"Sent {len(commands)} command(s) to Max"}
+
+    # Max's replies carry no request id, so only one query may wait at a time;
+    # otherwise two concurrent queries could each take the other's reply.
+    _query_lock = asyncio.Lock()
+
+    async def _request_max_and_wait(command: str, timeout_seconds: float = 15.0) -> str:
         command = command.strip()
         if not command or timeout_seconds <= 0:
             return ""
-        if not bach.send_info(command):
-            return ""
-        message = bach.wait_for_incoming(timeout_seconds=timeout_seconds, message_type=None)
+        async with _query_lock:
+            # Queries are never batched: they need their reply now, and it has to
+            # reflect every command queued before them.
+            if not _flush_command_batch():
+                return ""
+            if not _send_info(command):
+                return ""
+            # Awaiting (rather than blocking) keeps the server's event loop free
+            # for other requests while Max computes the reply.
+            message = await _wait_for_incoming(timeout_seconds=timeout_seconds, message_type=None)
         if message is None:
             return ""
         return str(message.get("data", ""))
 
-    def _validate_llll(s: str) -> Optional[str]:
-        """Validate a raw llll string for structural correctness.
-
-        Returns None if the string is valid, or a descriptive error message if not.
-
-        Checks performed:
-        - Balanced square brackets (no unclosed or extra closing brackets)
-        - No empty outermost string (caller should guard for this separately)
-        - No illegal characters that have no meaning in llll (curly braces, angle brackets)
-        - Bracket depth never goes negative (extra closing bracket)
-        - Warns about suspiciously unbalanced nesting depth anomalies
-
-        Does NOT validate semantic correctness (e.g. correct pitch values, onset ordering).
-        That remains the responsibility of bach.roll itself.
-        """
-        depth = 0
-        for i, ch in enumerate(s):
-            if ch == "[":
-                depth += 1
-            elif ch == "]":
-                depth -= 1
-                if depth < 0:
-                    # Find context around the error
-                    snippet = s[max(0, i - 20) : i + 20].replace("\n", " ")
-                    return (
-                        f"llll validation error: unexpected closing bracket ']' at position {i} "
-                        f"(depth went negative). Context: '...{snippet}...'"
-                    )
-        if depth != 0:
-            return (
-                f"llll validation error: {depth} unclosed bracket(s) '[' remain at end of string. "
-                f"Every '[' must have a matching ']'."
-            )
-        # Check for characters that are never valid in llll
-        illegal = set("{}")
-        found_illegal = [ch for ch in s if ch in illegal]
-        if found_illegal:
-            chars = ", ".join(f"'{c}'" for c in sorted(set(found_illegal)))
-            return (
-                f"llll validation error: illegal character(s) found: {chars}. "
-                f"llll only uses square brackets [ ] for grouping."
-            )
-        return None  # all checks passed
-
     def add_single_note(
         onset_ms: float = 0.0,
         pitch_cents: float = 6000.0,
@@ -169,47 +616,46 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
                         voice=2, note_flag=2)
         """
         if duration_ms <= 0:
-            return {"ok": False, "message": "duration_ms must be > 0"}
+            return _ERR_DURATION
         if velocity < 0 or velocity > 127:
-            return {"ok": False, "message": "velocity must be between 0 and 127"}
+            return _ERR_VELOCITY
         if voice <= 0:
-            return {"ok": False, "message": "voice must be > 0"}
+            return _ERR_VOICE
+
+        slots = slots.strip()
+        breakpoints = breakpoints.strip()
+        name = name.strip()
 
         # Validate raw llll sub-strings before building
-        if slots.strip():
+        if slots:
             err = _validate_llll(slots)
             if err:
                 return {"ok": False, "message": f"Invalid slots llll — {err}"}
-        if breakpoints.strip():
+        if breakpoints:
             err = _validate_llll(breakpoints)
             if err:
                 return {"ok": False, "message": f"Invalid breakpoints llll — {err}"}
 
-        # Build note specifications
-        specs = []
-        if breakpoints.strip():
-            specs.append(breakpoints.strip())
-        if slots.strip():
-            specs.append(slots.strip())
-        if name.strip():
-            specs.append(f"[name {name.strip()}]")
+        # Note specifications as conditional suffixes, in bach's order
+        bp_part = f" {breakpoints}" if breakpoints else ""
+        slots_part = f" {slots}" if slots else ""
+        name_part = f" [name {name}]" if name else ""
+        specs_str = f"{bp_part}{slots_part}{name_part}"
 
-        specs_str = (" " + " ".join(specs)) if specs else ""
-
-        note = (
-            f"[ {float(pitch_cents):.3f} {float(duration_ms):.3f} "
-            f"{int(velocity)}{specs_str} {int(note_flag)} ]"
+        # Note and its enclosing chord in a single build: [ onset [ pitch dur vel specs flag ] 0 ]
+        chord = (
+            f"[ {onset_ms:.3f} [ {pitch_cents:.3f} {duration_ms:.3f} "
+            f"{_as_int(velocity)}{specs_str} {_as_int(note_flag)} ] 0 ]"
         )
-        chord = f"[ {float(onset_ms):.3f} {note} 0 ]"
 
         # Build full score with the right number of empty voices before the target voice
-        voices = ["[ 0 ]"] * (voice - 1) + [f"[ {chord} 0 ]"]
-        score_llll = "[ " + " ".join(voices) + " ]"
+        empty_voices = "[ 0 ] " * (voice - 1)
+        score_llll = f"[ {empty_voices}[ {chord} 0 ] ]"
 
-        success = bach.send_score(score_llll)
+        success = _send_score(score_llll)
         if not success:
-            return {"ok": False, "message": "Failed to send llll score to Max"}
-        return {"ok": True, "score_llll": score_llll}
+            return _ERR_SCORE_SEND_FAILED
+        return {"ok": True, "message": score_llll}
 
     @mcp.tool()
     def send_score_to_max(score_llll: str) -> str:
@@ -238,12 +684,15 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         if not score_llll:
             return "Rejected empty llll score"
         # Extract the llll body (everything after the leading "roll" keyword) for bracket validation
-        body = score_llll[4:].strip() if score_llll.lower().startswith("roll") else score_llll
+        prefix = _ROLL_PREFIX_RE.match(score_llll)
+        body = score_llll[prefix.end():].lstrip() if prefix else score_llll
         err = _validate_llll(body)
         if err:
             return f"Rejected llll score — {err}"
-        success = bach.send_score(score_llll)
-        return "Sent llll score to Max" if success else "Failed to send llll score"
+        success = _send_score(score_llll)
+        if not success:
+            return "Failed to send llll score"
+        return "Queued llll score" if _command_batch is not None else "Sent llll score to Max"
 
     # TEMPORARILY DISABLED — bach.eval / bell language
     # @mcp.tool()
@@ -281,16 +730,18 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
     #     Example — 16 random chromatic pitches:
     #         $v = 'null'; $t = 0.; for $i in 1...16 do ($p = round(random(6000, 7200) / 100) * 100; $v _= [$t [$p 250. 90 0] 0]; $t += 250.); 'roll' [$v 0]
     #
-    #     Returns: ok, sent_code.
+    #     Returns: ok, message (the bell code sent).
     #     """
-    #     bell_code = bell_code.strip()
+    #     # Flatten to the single-line form Max requires: one C-level split/join
+    #     # strips the ends, turns newlines/tabs into spaces and collapses runs.
+    #     bell_code = " ".join(bell_code.split())
     #     if not bell_code:
     #         return {"ok": False, "message": "Rejected empty bell code"}
     #     message = f"bell {bell_code}"
-    #     success = bach.send_info(message)
+    #     success = _send_info(message)
     #     if not success:
     #         return {"ok": False, "message": "Failed to send bell code to Max"}
-    #     return {"ok": True, "sent_code": bell_code}
+    #     return {"ok": True, "message": bell_code}
 
     @mcp.tool()
     def send_process_message_to_max(message: str) -> str:
@@ -312,11 +763,95 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         message = message.strip()
         if not message:
             return "Rejected empty process message"
-        success = bach.send_info(message)
-        return "Sent process message to Max" if success else "Failed to send process message"
+        result = _send_max_message(message)
+        if not result["ok"]:
+            return "Failed to send process message"
+        return "Queued process message" if _command_batch is not None else "Sent process message to Max"
 
     @mcp.tool()
-    def dump(
+    def send_process_messages_to_max(messages: List[str]) -> str:
+        """ESCAPE HATCH, several at once — send raw commands with no dedicated tool in one go.
+
+        Same rules as send_process_message_to_max(): only for commands that have
+        no dedicated tool, fire-and-forget, no response. The commands go to Max
+        in list order as a single transmission instead of one call each.
+        Empty entries are skipped.
+
+        Example:
+        - ["activepart 2", "showpartcolors 1"]
+        """
+        commands = [m for m in (message.strip() for message in messages) if m]
+        if not commands:
+            return "Rejected empty process messages"
+        result = _send_max_messages(commands)
+        if not result["ok"]:
+            return "Failed to send process messages"
+        if _command_batch is not None:
+            return f"Queued {len(commands)} process message(s)"
+        return f"Sent {len(commands)} process message(s) to Max"
+
+    @mcp.tool()
+    def begin_batch() -> Dict[str, Any]:
+        """Start collecting commands so they reach Max in one send instead of one each.
+
+        After begin_batch(), every command tool (numvoices, clefs, stafflines,
+        addmarker, sel, addchord, send_score_to_max, send_process_message_to_max,
+        ...) is queued instead of sent, and returns ok with "Queued: <command>".
+        Call end_batch() to send everything, in call order, as one transmission.
+        Use it when setting up a score with many back-to-back commands.
+
+        Query tools (dump, getnumvoices, get_marker, ...) are never queued: they
+        first send whatever is queued so their answer reflects it, then wait
+        for Max as usual. The batch stays open.
+
+        Calling begin_batch() while a batch is open first sends what it holds;
+        the batch then stays open. A batch that gets no new command for 2 seconds
+        is sent and closed on its own, so a forgotten end_batch() only delays
+        commands briefly.
+        Returns: ok, message.
+        """
+        nonlocal _command_batch
+        with _command_batch_lock:
+            if _command_batch is None:
+                _command_batch = []
+                _restart_command_batch_timer()
+                return _OK_COMMAND_BATCH_STARTED
+            pending = len(_command_batch)
+            if not _flush_command_batch():
+                return {
+                    "ok": False,
+                    "message": f"Failed to send {pending} batched command(s) to Max; they are still queued",
+                }
+            _restart_command_batch_timer()
+            return {"ok": True, "message": f"Sent {pending} batched command(s) to Max; command batch still open"}
+
+    @mcp.tool()
+    def end_batch() -> Dict[str, Any]:
+        """Send every command queued since begin_batch() to Max and close the batch.
+
+        Commands arrive in the order they were issued, one Max message each.
+        If the send fails, the batch stays open with its commands; call
+        end_batch() again to retry. If the batch was already closed after
+        sitting idle, its commands were sent then and this reports no batch open.
+        Returns: ok, message (how many commands were sent).
+        """
+        with _command_batch_lock:
+            if _command_batch is None:
+                return _ERR_NO_COMMAND_BATCH
+            pending = len(_command_batch)
+            if not pending:
+                _close_command_batch()
+                return _OK_COMMAND_BATCH_EMPTY
+            if not _flush_command_batch():
+                return {
+                    "ok": False,
+                    "message": f"Failed to send {pending} batched command(s) to Max; batch left open",
+                }
+            _close_command_batch()
+            return {"ok": True, "message": f"Sent {pending} batched command(s) to Max"}
+
+    @mcp.tool()
+    async def dump(
         selection: bool = False,
         mode: str = "",
         dump_options: str = "",
@@ -372,19 +907,16 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - dump(mode="", dump_options="keys clefs body") -> "dump keys clefs body"
         - dump()                                        -> "dump" (everything — use sparingly)
         """
-        command_parts = ["dump"]
-        if selection:
-            command_parts.append("selection")
-        if mode:
-            command_parts.append(mode.strip())
-        if dump_options:
-            command_parts.append(dump_options.strip())
-
-        command = " ".join(command_parts)
-        return _request_max_and_wait(command=command, timeout_seconds=timeout_seconds)
+        mode = mode.strip()
+        dump_options = dump_options.strip()
+        sel_part = " selection" if selection else ""
+        mode_part = f" {mode}" if mode else ""
+        options_part = f" {dump_options}" if dump_options else ""
+        command = f"dump{sel_part}{mode_part}{options_part}"
+        return await _request_max_and_wait(command=command, timeout_seconds=timeout_seconds)
 
     @mcp.tool()
-    def get_length(timeout_seconds: float = 10.0) -> str:
+    async def get_length(timeout_seconds: float = 10.0) -> str:
         """Query bach.roll for the total score length in milliseconds.
 
         Returns: length <length_ms>
@@ -394,10 +926,10 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
 
         This is a read-only query; it does not modify the score.
         """
-        return _request_max_and_wait("getlength", timeout_seconds=timeout_seconds)
+        return await _request_max_and_wait("getlength", timeout_seconds=timeout_seconds)
 
     @mcp.tool()
-    def get_marker(
+    async def get_marker(
         names: str = "",
         name_first: bool = False,
         timeout_seconds: float = 10.0,
@@ -432,16 +964,10 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
 
         This is a read-only query; it does not modify the score.
         """
-        parts = ["getmarker"]
-        if name_first:
-            parts.append("@namefirst 1")
-        if names.strip():
-            parts.append(names.strip())
-        return _request_max_and_wait(" ".join(parts), timeout_seconds=timeout_seconds)
-
-    def bgcolor(r: float = 1.0, g: float = 1.0, b: float = 1.0, a: float = 1.0) -> Dict[str, Any]:
-        # Internal helper. Use set_appearance("bgcolor", "r g b a") from tools.
-        return _send_max_message(f"bgcolor {float(r)} {float(g)} {float(b)} {float(a)}")
+        names = names.strip()
+        first = " @namefirst 1" if name_first else ""
+        names_part = f" {names}" if names else ""
+        return await _request_max_and_wait(f"getmarker{first}{names_part}", timeout_seconds=timeout_seconds)
 
     @mcp.tool()
     def clefs(clefs_list: str = "G") -> Dict[str, Any]:
@@ -534,13 +1060,9 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """
         clefs_list = clefs_list.strip()
         if not clefs_list:
-            return {"ok": False, "message": "clefs_list cannot be empty"}
+            return _ERR_EMPTY_CLEFS_LIST
         return _send_max_message(f"clefs {clefs_list}")
 
-    def notecolor(r: float = 0.0, g: float = 0.0, b: float = 0.0, a: float = 1.0) -> Dict[str, Any]:
-        # Internal helper. Use set_appearance("notecolor", "r g b a") from tools.
-        return _send_max_message(f"notecolor {float(r)} {float(g)} {float(b)} {float(a)}")
-
     @mcp.tool()
     def numparts(parts: str = "1") -> Dict[str, Any]:
         """Set the part grouping for voices in bach.roll via voice ensembles.
@@ -632,7 +1154,7 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """
         parts = parts.strip()
         if not parts:
-            return {"ok": False, "message": "parts cannot be empty"}
+            return _ERR_EMPTY_PARTS
         return _send_max_message(f"numparts {parts}")
 
     @mcp.tool()
@@ -676,12 +1198,8 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         count must be > 0. Reducing voice count deletes content permanently.
         """
         if count <= 0:
-            return {"ok": False, "message": "count must be > 0"}
-        return _send_max_message(f"numvoices {int(count)}")
-
-    def staffcolor(r: float = 0.0, g: float = 0.0, b: float = 0.0, a: float = 1.0) -> Dict[str, Any]:
-        # Internal helper. Use set_appearance("staffcolor", "r g b a") from tools.
-        return _send_max_message(f"staffcolor {float(r)} {float(g)} {float(b)} {float(a)}")
+            return _ERR_COUNT
+        return _send_max_message(f"numvoices {_as_int(count)}")
 
     @mcp.tool()
     def stafflines(value: str) -> Dict[str, Any]:
@@ -717,8 +1235,11 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """
         value = value.strip()
         if not value:
-            return {"ok": False, "message": "value cannot be empty"}
-        return _send_max_message(f"stafflines {value}")
+            return _ERR_EMPTY_VALUE
+        err = _validate_llll(value)
+        if err:
+            return {"ok": False, "message": f"Invalid stafflines value — {err}"}
+        return _send_max_message(f"stafflines {value}", changes_counts=False)
 
     @mcp.tool()
     def voicenames(value: str) -> Dict[str, Any]:
@@ -748,8 +1269,31 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """
         value = value.strip()
         if not value:
-            return {"ok": False, "message": "value cannot be empty"}
-        return _send_max_message(f"voicenames {value}")
+            return _ERR_EMPTY_VALUE
+        err = _validate_llll(value)
+        if err:
+            return {"ok": False, "message": f"Invalid voicenames value — {err}"}
+        if value.count('"') % 2:
+            return _ERR_VOICENAMES_UNCLOSED_QUOTE
+        return _send_max_message(f"voicenames {value}", changes_counts=False)
+
+    def _addmarker_command(
+        position: str, name_or_names: str, role: str = "", content: str = ""
+    ) -> Union[str, Dict[str, Any]]:
+        # The addmarker message, or an error response for invalid arguments.
+        position = position.strip()
+        name_or_names = name_or_names.strip()
+        role = role.strip()
+        content = content.strip()
+        if not position:
+            return _ERR_EMPTY_POSITION
+        if not name_or_names:
+            return _ERR_EMPTY_NAME_OR_NAMES
+
+        # content is positional after role, so it is only sent along with a role.
+        role_part = f" {role}" if role else ""
+        content_part = f" {content}" if role and content else ""
+        return f"addmarker {position} {name_or_names}{role_part}{content_part}"
 
     @mcp.tool()
     def addmarker(
@@ -778,22 +1322,42 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - addmarker("end", "fine")      -> marker named "fine" at end of score
         - addmarker("1500.", "verse")   -> marker named "verse" at 1500ms
         """
-        position = position.strip()
-        name_or_names = name_or_names.strip()
-        role = role.strip()
-        content = content.strip()
-        if not position:
-            return {"ok": False, "message": "position cannot be empty"}
-        if not name_or_names:
-            return {"ok": False, "message": "name_or_names cannot be empty"}
-
-        command = f"addmarker {position} {name_or_names}"
-        if role:
-            command = f"{command} {role}"
-            if content:
-                command = f"{command} {content}"
+        command = _addmarker_command(position, name_or_names, role, content)
+        if isinstance(command, dict):
+            return command
         return _send_max_message(command)
 
+    @mcp.tool()
+    def addmarkers(markers: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Add many markers at once — one send to Max instead of one per marker.
+
+        Each entry takes the same fields as addmarker(): "position" and
+        "name_or_names" (required), "role" and "content" (optional, rarely needed).
+        Markers are added in list order. If any entry is invalid nothing is sent.
+
+        Example:
+        - addmarkers([{"position": "0.", "name_or_names": "intro"},
+                      {"position": "8000.", "name_or_names": "verse"},
+                      {"position": "end", "name_or_names": "fine"}])
+          -> "addmarker 0. intro", "addmarker 8000. verse", "addmarker end fine"
+        """
+        if not markers:
+            return _ERR_EMPTY_MARKERS
+        commands = []
+        for index, marker in enumerate(markers, 1):
+            if not isinstance(marker, dict):
+                return {"ok": False, "message": f"marker {index}: expected an object with position and name_or_names"}
+            command = _addmarker_command(
+                str(marker.get("position", "")),
+                str(marker.get("name_or_names", "")),
+                str(marker.get("role", "")),
+                str(marker.get("content", "")),
+            )
+            if isinstance(command, dict):
+                return {"ok": False, "message": f"marker {index}: {command['message']}"}
+            commands.append(command)
+        return _send_max_messages(commands)
+
     @mcp.tool()
     def deletemarker(marker_names: str) -> Dict[str, Any]:
         """Delete the first marker in bach.roll that matches the given name(s).
@@ -814,7 +1378,7 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """
         marker_names = marker_names.strip()
         if not marker_names:
-            return {"ok": False, "message": "marker_names cannot be empty"}
+            return _ERR_EMPTY_MARKER_NAMES
         return _send_max_message(f"deletemarker {marker_names}")
 
     @mcp.tool()
@@ -831,8 +1395,8 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - deletevoice(3)  -> deletes the third voice
         """
         if voice_number <= 0:
-            return {"ok": False, "message": "voice_number must be > 0"}
-        return _send_max_message(f"deletevoice {int(voice_number)}")
+            return _ERR_VOICE_NUMBER
+        return _send_max_message(f"deletevoice {_as_int(voice_number)}")
 
     @mcp.tool()
     def exportmidi(
@@ -871,23 +1435,24 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - exportmidi("mymidi.mid", format=0)              -> single track MIDI
         - exportmidi("mymidi.mid", resolution=1920)       -> higher resolution
         """
-        parts = ["exportmidi"]
         filename = filename.strip()
         voices = voices.strip()
-        if filename:
-            parts.append(filename)
-        parts.append(f"[exportmarkers {int(exportmarkers)}]")
-        parts.append(f"[exportbarlines {int(exportbarlines)}]")
-        parts.append(f"[exportdivisions {int(exportdivisions)}]")
-        parts.append(f"[exportsubdivisions {int(exportsubdivisions)}]")
-        if voices:
-            parts.append(f"[voices {voices}]")
-        parts.append(f"[format {int(format)}]")
-        parts.append(f"[resolution {int(resolution)}]")
-        return _send_max_message(" ".join(parts))
+        filename_part = f" {filename}" if filename else ""
+        if not voices and (
+            exportmarkers, exportbarlines, exportdivisions, exportsubdivisions, format, resolution
+        ) == (1, 1, 1, 1, 1, 960):
+            return _send_max_message(f"exportmidi{filename_part} {_EXPORTMIDI_DEFAULT_ATTRS}")
+        voices_part = f" [voices {voices}]" if voices else ""
+        # Whole command in a single build rather than a list of fragments joined afterwards.
+        return _send_max_message(
+            f"exportmidi{filename_part} [exportmarkers {_as_int(exportmarkers)}] "
+            f"[exportbarlines {_as_int(exportbarlines)}] [exportdivisions {_as_int(exportdivisions)}] "
+            f"[exportsubdivisions {_as_int(exportsubdivisions)}]{voices_part} "
+            f"[format {_as_int(format)}] [resolution {_as_int(resolution)}]"
+        )
 
     @mcp.tool()
-    def getcurrentchord(timeout_seconds: float = 15.0) -> str:
+    async def getcurrentchord(timeout_seconds: float = 15.0) -> str:
         """Return the notes sounding at the current cursor position in bach.roll.
 
         Sends "getcurrentchord" to Max and waits for a response. The response
@@ -899,10 +1464,10 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
 
         - timeout_seconds: how long to wait for Max to respond before giving up.
         """
-        return _request_max_and_wait("getcurrentchord", timeout_seconds=timeout_seconds)
+        return await _request_max_and_wait("getcurrentchord", timeout_seconds=timeout_seconds)
 
     @mcp.tool()
-    def getnumchords(query_label: str = "", timeout_seconds: float = 15.0) -> str:
+    async def getnumchords(query_label: str = "", timeout_seconds: float = 15.0) -> str:
         """Return the number of chords for each voice in bach.roll as an llll.
 
         Sends "getnumchords" to Max and waits for a response.
@@ -914,10 +1479,10 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         command = "getnumchords"
         if query_label:
             command = f"getnumchords [label {query_label}]"
-        return _request_max_and_wait(command, timeout_seconds=timeout_seconds)
+        return await _cached_query(command, timeout_seconds)
 
     @mcp.tool()
-    def getnumnotes(query_label: str = "", timeout_seconds: float = 15.0) -> str:
+    async def getnumnotes(query_label: str = "", timeout_seconds: float = 15.0) -> str:
         """Return the number of notes for each chord in each voice in bach.roll as an llll.
 
         Sends "getnumnotes" to Max and waits for a response.
@@ -929,10 +1494,32 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         command = "getnumnotes"
         if query_label:
             command = f"getnumnotes [label {query_label}]"
-        return _request_max_and_wait(command, timeout_seconds=timeout_seconds)
+        return await _cached_query(command, timeout_seconds)
 
     @mcp.tool()
-    def getnumvoices(query_label: str = "", timeout_seconds: float = 15.0) -> str:
+    async def getnumnotes_parsed(query_label: str = "", timeout_seconds: float = 15.0) -> Dict[str, Any]:
+        """Same query as getnumnotes(), with the reply already parsed into numbers.
+
+        Use this when you need to count or compare notes rather than read the llll.
+
+        Returns: ok, message (the raw reply), counts (one list per voice, one note
+        count per chord, e.g. [[3, 4, 2], [1, 5]]) and total (all notes in the score).
+        """
+        query_label = query_label.strip()
+        command = "getnumnotes"
+        if query_label:
+            command = f"getnumnotes [label {query_label}]"
+        reply = await _cached_query(command, timeout_seconds)
+        if not reply:
+            return _ERR_NO_NUMNOTES_REPLY
+        counts = _parse_llll_ints(reply)
+        # A reply wrapped in one outer list still means one entry per voice.
+        if len(counts) == 1 and isinstance(counts[0], list) and all(isinstance(v, list) for v in counts[0]):
+            counts = counts[0]
+        return {"ok": True, "message": reply, "counts": counts, "total": _sum_nested(counts)}
+
+    @mcp.tool()
+    async def getnumvoices(query_label: str = "", timeout_seconds: float = 15.0) -> str:
         """Return the current number of voices in bach.roll.
 
         Sends "getnumvoices" to Max and waits for a response.
@@ -951,7 +1538,7 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         command = "getnumvoices"
         if query_label:
             command = f"getnumvoices [label {query_label}]"
-        return _request_max_and_wait(command, timeout_seconds=timeout_seconds)
+        return await _cached_query(command, timeout_seconds)
 
     @mcp.tool()
     def glissando(trim_or_extend: str = "", slope: float = 0.0) -> Dict[str, Any]:
@@ -975,12 +1562,19 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - glissando(trim_or_extend="trim")               -> "glissando trim 0.0"
         - glissando(trim_or_extend="extend", slope=-0.4) -> "glissando extend -0.4"
         """
-        trim_or_extend = trim_or_extend.strip()
-        parts = ["glissando"]
-        if trim_or_extend:
-            parts.append(trim_or_extend)
-        parts.append(str(float(slope)))
-        return _send_max_message(" ".join(parts))
+        prefix = _GLISSANDO_PREFIXES.get(trim_or_extend)
+        if prefix is None:
+            trim_or_extend = trim_or_extend.strip()
+            prefix = f"glissando {trim_or_extend}" if trim_or_extend else "glissando"
+        return _send_max_message(f"{prefix} {_as_float(slope)}")
+
+    def _insertvoice_command(voice_number: int, voice_or_ref: str = "") -> Union[str, Dict[str, Any]]:
+        # The insertvoice message, or an error response for invalid arguments.
+        if voice_number <= 0:
+            return _ERR_VOICE_NUMBER
+        voice_or_ref = voice_or_ref.strip()
+        ref_part = f" {voice_or_ref}" if voice_or_ref else ""
+        return f"insertvoice {_as_int(voice_number)}{ref_part}"
 
     @mcp.tool()
     def insertvoice(voice_number: int, voice_or_ref: str = "") -> Dict[str, Any]:
@@ -999,14 +1593,40 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - insertvoice(1, "2")          -> "insertvoice 1 2" (copy properties of voice 2)
         - insertvoice(1, "[ [ 125.714286 [ 6300. ...") -> insert with llll content
         """
-        if voice_number <= 0:
-            return {"ok": False, "message": "voice_number must be > 0"}
-        voice_or_ref = voice_or_ref.strip()
-        command = f"insertvoice {int(voice_number)}"
-        if voice_or_ref:
-            command = f"{command} {voice_or_ref}"
+        command = _insertvoice_command(voice_number, voice_or_ref)
+        if isinstance(command, dict):
+            return command
         return _send_max_message(command)
 
+    @mcp.tool()
+    def insertvoices(voices: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Insert several voices at once — one send to Max instead of one per voice.
+
+        Each entry takes the same fields as insertvoice(): "voice_number"
+        (required, 1-indexed) and "voice_or_ref" (optional). Insertions run in
+        list order, so each voice_number refers to the score as left by the
+        entries before it. If any entry is invalid nothing is sent.
+
+        Example:
+        - insertvoices([{"voice_number": 2}, {"voice_number": 3, "voice_or_ref": "1"}])
+          -> "insertvoice 2", "insertvoice 3 1"
+        """
+        if not voices:
+            return _ERR_EMPTY_VOICES
+        commands = []
+        for index, voice in enumerate(voices, 1):
+            if not isinstance(voice, dict):
+                return {"ok": False, "message": f"voice {index}: expected an object with voice_number"}
+            try:
+                voice_number = _as_int(voice.get("voice_number", 0))
+            except (TypeError, ValueError):
+                return {"ok": False, "message": f"voice {index}: voice_number must be an integer"}
+            command = _insertvoice_command(voice_number, str(voice.get("voice_or_ref", "")))
+            if isinstance(command, dict):
+                return {"ok": False, "message": f"voice {index}: {command['message']}"}
+            commands.append(command)
+        return _send_max_messages(commands)
+
     @mcp.tool()
     def legato(trim_or_extend: str = "") -> Dict[str, Any]:
         """Apply legato transform to currently selected notes in bach.roll.
@@ -1028,8 +1648,10 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - legato(trim_or_extend="trim")    -> "legato trim"
         - legato(trim_or_extend="extend")  -> "legato extend"
         """
-        trim_or_extend = trim_or_extend.strip()
-        command = "legato" if not trim_or_extend else f"legato {trim_or_extend}"
+        command = _LEGATO_COMMANDS.get(trim_or_extend)
+        if command is None:
+            trim_or_extend = trim_or_extend.strip()
+            command = f"legato {trim_or_extend}" if trim_or_extend else "legato"
         return _send_max_message(command)
 
     @mcp.tool()
@@ -1053,14 +1675,12 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - play(start_ms=1000, end_ms=5000)    -> "play 1000. 5000." (specific range)
         """
         scheduling_mode = scheduling_mode.strip()
-        parts = ["play"]
-        if scheduling_mode:
-            parts.append(scheduling_mode)
-        if start_ms is not None:
-            parts.append(str(float(start_ms)))
-        if end_ms is not None:
-            parts.append(str(float(end_ms)))
-        return _send_max_message(" ".join(parts))
+        if not scheduling_mode and start_ms is None and end_ms is None:
+            return _send_max_message("play")
+        mode = f" {scheduling_mode}" if scheduling_mode else ""
+        start = f" {_as_float(start_ms)}" if start_ms is not None else ""
+        end = f" {_as_float(end_ms)}" if end_ms is not None else ""
+        return _send_max_message(f"play{mode}{start}{end}")
 
     @mcp.tool()
     def sel(arguments: str) -> Dict[str, Any]:
@@ -1124,9 +1744,18 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
 
         Use clearselection() to deselect everything.
         """
+        command = _SEL_CATEGORY_COMMANDS.get(arguments)
+        if command is not None:
+            return _send_max_message(command)
         arguments = arguments.strip()
         if not arguments:
-            return {"ok": False, "message": "arguments cannot be empty"}
+            return _ERR_EMPTY_ARGUMENTS
+        # Catch malformed selections here instead of a round trip to Max.
+        err = _validate_llll(arguments)
+        if err:
+            return {"ok": False, "message": f"Invalid sel arguments — {err}"}
+        if _SEL_EMPTY_CONDITION_RE.match(arguments):
+            return _ERR_SEL_EMPTY_CONDITION
         return _send_max_message(f"sel {arguments}")
 
     @mcp.tool()
@@ -1201,18 +1830,16 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - dynamics2velocities(selection=True, breakpointmode=2)
           -> "dynamics2velocities selection @breakpointmode 2"
         """
-        parts = ["dynamics2velocities"]
-        if selection:
-            parts.append("selection")
-        if mapping.strip():
-            parts.append(f"@mapping {mapping.strip()}")
-        if maxchars >= 0:
-            parts.append(f"@maxchars {int(maxchars)}")
-        if exp >= 0:
-            parts.append(f"@exp {float(exp)}")
-        if breakpointmode >= 0:
-            parts.append(f"@breakpointmode {int(breakpointmode)}")
-        return _send_max_message(" ".join(parts))
+        mapping = mapping.strip()
+        # Common case: bach defaults throughout, nothing to assemble.
+        if not (selection or mapping) and maxchars < 0 and exp < 0 and breakpointmode < 0:
+            return _send_max_message("dynamics2velocities")
+        sel = " selection" if selection else ""
+        mp = f" @mapping {mapping}" if mapping else ""
+        mc = f" @maxchars {_as_int(maxchars)}" if maxchars >= 0 else ""
+        ex = f" @exp {_as_float(exp)}" if exp >= 0 else ""
+        bm = f" @breakpointmode {_as_int(breakpointmode)}" if breakpointmode >= 0 else ""
+        return _send_max_message(f"dynamics2velocities{sel}{mp}{mc}{ex}{bm}")
 
     @mcp.tool()
     def velocities2dynamics(
@@ -1260,16 +1887,15 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - velocities2dynamics(maxchars=2, exp=0.5)
           -> "velocities2dynamics @maxchars 2 @exp 0.5"
         """
-        parts = ["velocities2dynamics"]
-        if selection:
-            parts.append("selection")
-        if mapping.strip():
-            parts.append(f"@mapping {mapping.strip()}")
-        if maxchars >= 0:
-            parts.append(f"@maxchars {int(maxchars)}")
-        if exp >= 0:
-            parts.append(f"@exp {float(exp)}")
-        return _send_max_message(" ".join(parts))
+        mapping = mapping.strip()
+        # Common case: bach defaults throughout, nothing to assemble.
+        if not (selection or mapping) and maxchars < 0 and exp < 0:
+            return _send_max_message("velocities2dynamics")
+        sel = " selection" if selection else ""
+        mp = f" @mapping {mapping}" if mapping else ""
+        mc = f" @maxchars {_as_int(maxchars)}" if maxchars >= 0 else ""
+        ex = f" @exp {_as_float(exp)}" if exp >= 0 else ""
+        return _send_max_message(f"velocities2dynamics{sel}{mp}{mc}{ex}")
 
     @mcp.tool()
     def define_slot(
@@ -1277,10 +1903,10 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         type: str = "",
         name: str = "",
         key: str = "",
-        range_min: float = float("nan"),
-        range_max: float = float("nan"),
+        range_min: Optional[float] = None,
+        range_max: Optional[float] = None,
         representation: str = "",
-        slope: float = float("nan"),
+        slope: Optional[float] = None,
         width: str = "",
         default: str = "",
         ysnap: str = "",
@@ -1301,7 +1927,8 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         Parameters:
         - slot_number: which slot to configure (1-indexed)
 
-        - type: the slot type. Available types:
+        - type: the slot type; any other value is rejected without contacting Max.
+            Available types:
             - "function"      breakpoint function (x, y, slope per point)
             - "int"           single integer value
             - "float"         single float value
@@ -1329,14 +1956,14 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - range_min, range_max: display range for the slot values.
             For function slots this sets the Y axis range.
             Example: range_min=0, range_max=22050 for a frequency slot.
-            Leave as nan to keep existing range.
+            Leave as None to keep existing range.
 
         - representation: unit label shown in the slot window (e.g. "Hz", "degree", "dB")
 
         - slope: non-linearity exponent for the slot display curve.
             - 0.0  = linear (default)
             - 0.5  = logarithmic-like (useful for frequency)
-            Leave as nan to keep existing slope.
+            Leave as None to keep existing slope.
 
         - width: slot window width. Either:
             - a number (e.g. "80") for a fixed pixel width
@@ -1369,38 +1996,43 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
                       range_min=0, range_max=1, width="80", default="0.5")
           -> "[slotinfo [3 [type floatmatrix] [name routing] [key r] [range 0 1] [width 80] [default 0.5]]]"
         """
-        import math
         if slot_number <= 0:
-            return {"ok": False, "message": "slot_number must be > 0"}
-
-        parts = []
-        if type.strip():
-            parts.append(f"[type {type.strip()}]")
-        if name.strip():
-            parts.append(f"[name {name.strip()}]")
-        if key.strip():
-            parts.append(f"[key {key.strip()}]")
-        if not math.isnan(range_min) and not math.isnan(range_max):
-            parts.append(f"[range {float(range_min)} {float(range_max)}]")
-        if representation.strip():
-            parts.append(f"[representation {representation.strip()}]")
-        if not math.isnan(slope):
-            parts.append(f"[slope {float(slope)}]")
-        if width.strip():
-            parts.append(f"[width {width.strip()}]")
-        if default.strip():
-            parts.append(f"[default {default.strip()}]")
-        if ysnap.strip():
-            parts.append(f"[ysnap {ysnap.strip()}]")
-        if color.strip():
-            parts.append(f"[color {color.strip()}]")
-
-        if not parts:
-            return {"ok": False, "message": "No slotinfo fields specified"}
+            return _ERR_SLOT_NUMBER
+
+        type = type.strip()
+        type_part = ""
+        if type:
+            type_part = _SLOT_TYPE_FRAGMENTS.get(type)
+            if type_part is None:
+                return {"ok": False, "message": f"Unknown slot type '{type}'"}
+        name = name.strip()
+        key = key.strip()
+        representation = representation.strip()
+        width = width.strip()
+        default = default.strip()
+        ysnap = ysnap.strip()
+        color = color.strip()
+        # Each field is either empty or a leading-space "[field value]" suffix.
+        inner = (
+            type_part
+            + (f" [name {name}]" if name else "")
+            + (f" [key {key}]" if key else "")
+            + (
+                f" [range {_as_float(range_min)} {_as_float(range_max)}]"
+                if range_min is not None and range_max is not None
+                else ""
+            )
+            + (f" [representation {representation}]" if representation else "")
+            + (f" [slope {_as_float(slope)}]" if slope is not None else "")
+            + (f" [width {width}]" if width else "")
+            + (f" [default {default}]" if default else "")
+            + (f" [ysnap {ysnap}]" if ysnap else "")
+            + (f" [color {color}]" if color else "")
+        )
+        if not inner:
+            return _ERR_NO_SLOTINFO_FIELDS
 
-        inner = " ".join(parts)
-        command = f"[slotinfo [{slot_number} {inner}]]"
-        return _send_max_message(command)
+        return _send_max_message(f"[slotinfo [{slot_number}{inner}]]")
 
     @mcp.tool()
     def erasebreakpoints() -> Dict[str, Any]:
@@ -1443,7 +2075,7 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """
         slot = slot.strip()
         if not slot:
-            return {"ok": False, "message": "slot cannot be empty"}
+            return _ERR_EMPTY_SLOT
         return _send_max_message(f"eraseslot {slot}")
 
     @mcp.tool()
@@ -1496,24 +2128,26 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - exportimage("/tmp/score.png", view="multiline", mspersystem=5000, systemvshift=10)
           -> "exportimage /tmp/score.png @view multiline @mspersystem 5000.0 @systemvshift 10"
         """
-        parts = ["exportimage"]
         filename = filename.strip()
-        if filename:
-            parts.append(filename)
-        if view.strip():
-            parts.append(f"@view {view.strip()}")
-        if mspersystem >= 0:
-            parts.append(f"@mspersystem {float(mspersystem)}")
-        if adaptwidth >= 0:
-            parts.append(f"@adaptwidth {int(adaptwidth)}")
-        if dpi >= 0:
-            parts.append(f"@dpi {int(dpi)}")
-        if systemvshift >= 0:
-            parts.append(f"@systemvshift {int(systemvshift)}")
-        return _send_max_message(" ".join(parts))
+        view = view.strip()
+        file_part = f" {filename}" if filename else ""
+        view_part = f" @view {view}" if view else ""
+        ms_part = f" @mspersystem {_as_float(mspersystem)}" if mspersystem >= 0 else ""
+        adapt_part = f" @adaptwidth {_as_int(adaptwidth)}" if adaptwidth >= 0 else ""
+        dpi_part = f" @dpi {_as_int(dpi)}" if dpi >= 0 else ""
+        vshift_part = f" @systemvshift {_as_int(systemvshift)}" if systemvshift >= 0 else ""
+        return _send_max_message(
+            f"exportimage{file_part}{view_part}{ms_part}{adapt_part}{dpi_part}{vshift_part}"
+        )
+
+    def _subroll_command(voices: str, time_lapse: str, selective_options: str, onset_only: bool) -> str:
+        selective_options = selective_options.strip()
+        onset = " onset" if onset_only else ""
+        options_part = f" {selective_options}" if selective_options else ""
+        return f"subroll{onset} {voices.strip()} {time_lapse.strip()}{options_part}"
 
     @mcp.tool()
-    def subroll(
+    async def subroll(
         voices: str = "[]",
         time_lapse: str = "[]",
         selective_options: str = "",
@@ -1562,15 +2196,30 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - subroll(voices="[4 5]", time_lapse="[1000 3000]", selective_options="[clefs markers body]")
           -> "subroll [4 5] [1000 3000] [clefs markers body]"
         """
-        parts = ["subroll"]
-        if onset_only:
-            parts.append("onset")
-        parts.append(voices.strip())
-        parts.append(time_lapse.strip())
-        if selective_options.strip():
-            parts.append(selective_options.strip())
-        command = " ".join(parts)
-        return _request_max_and_wait(command, timeout_seconds=timeout_seconds)
+        command = _subroll_command(voices, time_lapse, selective_options, onset_only)
+        return await _cached_query(command, timeout_seconds, _subroll_cache)
+
+    @mcp.tool()
+    async def subroll_parsed(
+        voices: str = "[]",
+        time_lapse: str = "[]",
+        selective_options: str = "",
+        onset_only: bool = False,
+        timeout_seconds: float = 15.0,
+    ) -> Dict[str, Any]:
+        """Same query as subroll(), with the reply already parsed into nested lists.
+
+        Use this when you need to inspect or compute on the extracted notes rather
+        than read the llll text. Numbers come back as ints/floats, everything else
+        (keywords, pitch names, rationals like 1/8) as strings.
+
+        Returns: ok, message (the raw reply) and llll (the parsed nested lists).
+        """
+        command = _subroll_command(voices, time_lapse, selective_options, onset_only)
+        reply = await _cached_query(command, timeout_seconds, _subroll_cache)
+        if not reply:
+            return _ERR_NO_SUBROLL_REPLY
+        return {"ok": True, "message": reply, "llll": _parse_llll(reply)}
 
     @mcp.tool()
     def write(filename: str = "") -> Dict[str, Any]:
@@ -1642,19 +2291,16 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - writetxt("myfile.txt", maxdepth=1)
           -> "writetxt myfile.txt @maxdepth 1"
         """
-        parts = ["writetxt"]
         filename = filename.strip()
-        if filename:
-            parts.append(filename)
-        if maxdecimals >= 0:
-            parts.append(f"@maxdecimals {int(maxdecimals)}")
-        if indent.strip():
-            parts.append(f"@indent {indent.strip()}")
-        if maxdepth >= -1:
-            parts.append(f"@maxdepth {int(maxdepth)}")
-        if wrap >= 0:
-            parts.append(f"@wrap {int(wrap)}")
-        return _send_max_message(" ".join(parts))
+        indent = indent.strip()
+        file_part = f" {filename}" if filename else ""
+        decimals_part = f" @maxdecimals {_as_int(maxdecimals)}" if maxdecimals >= 0 else ""
+        indent_part = f" @indent {indent}" if indent else ""
+        depth_part = f" @maxdepth {_as_int(maxdepth)}" if maxdepth >= -1 else ""
+        wrap_part = f" @wrap {_as_int(wrap)}" if wrap >= 0 else ""
+        return _send_max_message(
+            f"writetxt{file_part}{decimals_part}{indent_part}{depth_part}{wrap_part}"
+        )
 
     @mcp.tool()
     def set_appearance(attribute: str, value: str) -> Dict[str, Any]:
@@ -1666,6 +2312,11 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         All values are plain strings. RGBA colors are given as "r g b a"
         with floats from 0.0 to 1.0. Toggle values are integers (0=off, 1=on).
 
+        Only the attributes listed below are accepted; any other name is
+        rejected without contacting Max. For other bach.roll attributes use
+        send_process_message_to_max(). Setting an attribute to the value it was
+        given less than a second ago is skipped rather than sent again.
+
         CORE COLORS:
         - bgcolor             background color (default white: "1. 1. 1. 1.")
                               sends: "bgcolor 0. 0. 0. 1."
@@ -1787,10 +2438,17 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         attribute = attribute.strip()
         value = value.strip()
         if not attribute:
-            return {"ok": False, "message": "attribute cannot be empty"}
+            return _ERR_EMPTY_ATTRIBUTE
+        prefix = _APPEARANCE_PREFIXES.get(attribute)
+        if prefix is None:
+            return {"ok": False, "message": f"Unknown appearance attribute '{attribute}'"}
         if not value:
-            return {"ok": False, "message": "value cannot be empty"}
-        return _send_max_message(f"{attribute} {value}")
+            return _ERR_EMPTY_VALUE
+        last = _appearance_sent.get(attribute)
+        if last is not None and last[1] == value and time.monotonic() - last[0] < _APPEARANCE_REPEAT_SECONDS:
+            return {"ok": True, "message": f"Unchanged, not resent: {prefix}{value}"}
+        # Appearance never changes what the count queries report.
+        return _send_max_message(prefix + value, changes_counts=False)
 
     @mcp.tool()
     def addchord(
@@ -1831,22 +2489,18 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """
         chord_llll = chord_llll.strip()
         if not chord_llll:
-            return {"ok": False, "message": "chord_llll cannot be empty"}
+            return _ERR_EMPTY_CHORD_LLLL
         err = _validate_llll(chord_llll)
         if err:
             return {"ok": False, "message": f"Invalid chord_llll — {err}"}
-        parts = ["addchord"]
-        if voice != 1:
-            parts.append(str(int(voice)))
-        parts.append(chord_llll)
-        if select:
-            parts.append("@sel 1")
-        return _send_max_message(" ".join(parts))
+        voice_part = f" {_as_int(voice)}" if voice != 1 else ""
+        sel_part = " @sel 1" if select else ""
+        return _send_max_message(f"addchord{voice_part} {chord_llll}{sel_part}")
 
     @mcp.tool()
     def addchords(
         chords_llll: str,
-        offset_ms: float = float("nan"),
+        offset_ms: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Add multiple chords across voices to an existing bach.roll score.
 
@@ -1879,7 +2533,7 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
                        Use [] for voices where no chords are added.
 
         - offset_ms: optional time offset in milliseconds applied to all chords.
-                     Leave as nan to add chords at their literal onset times.
+                     Leave as None to add chords at their literal onset times.
 
         Examples (exact string sent to Max):
         - addchords("[[217 [7185 492 100]] [971 [6057 492 100]]] [[1665 [7157 492 100]]]")
@@ -1897,18 +2551,59 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - addchords("[] [[0 [6000 500 100]]]")
           -> voice 1 unchanged, voice 2 gets one note
         """
-        import math
         chords_llll = chords_llll.strip()
         if not chords_llll:
-            return {"ok": False, "message": "chords_llll cannot be empty"}
+            return _ERR_EMPTY_CHORDS_LLLL
         err = _validate_llll(chords_llll)
         if err:
             return {"ok": False, "message": f"Invalid chords_llll — {err}"}
-        parts = ["addchords"]
-        if not math.isnan(offset_ms):
-            parts.append(str(float(offset_ms)))
-        parts.append(chords_llll)
-        return _send_max_message(" ".join(parts))
+        offset = f" {_as_float(offset_ms)}" if offset_ms is not None else ""
+        return _send_max_message(f"addchords{offset} {chords_llll}")
+
+    @mcp.tool()
+    def addchords_to_voice(
+        chord_lllls: List[str],
+        voice: int = 1,
+        offset_ms: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Add many chords to one voice in a single addchords message.
+
+        Instead of calling addchord() once per chord, pass the chords as a list;
+        they are wrapped into one voice llll and sent as a single "addchords"
+        message, so Max inserts them all in one go. Each entry uses the same
+        gathered syntax as addchord(). If any entry is invalid nothing is sent.
+
+        Parameters:
+        - chord_lllls: list of chords, each "[ onset_ms NOTE1 NOTE2 ... ]"
+        - voice: voice number to add the chords to (1-indexed, default: 1)
+        - offset_ms: optional time offset in milliseconds applied to all chords.
+
+        One message means one parse in Max: very long lists (thousands of
+        chords) arrive as one large message and can stall the patch briefly;
+        split them into a few calls of a few hundred chords if that happens.
+
+        Examples (exact string sent to Max):
+        - addchords_to_voice(["[0 [6000 500 100]]", "[500 [6200 500 100]]"])
+          -> "addchords [[0 [6000 500 100]] [500 [6200 500 100]]]"
+        - addchords_to_voice(["[0 [6000 500 100]]"], voice=3, offset_ms=1000)
+          -> "addchords 1000.0 [] [] [[0 [6000 500 100]]]"
+        """
+        if voice <= 0:
+            return _ERR_VOICE
+        if not chord_lllls:
+            return _ERR_EMPTY_CHORD_LIST
+        chords = []
+        for index, chord_llll in enumerate(chord_lllls, 1):
+            chord_llll = chord_llll.strip()
+            if not chord_llll:
+                return {"ok": False, "message": f"chord {index}: chord_llll cannot be empty"}
+            err = _validate_llll(chord_llll)
+            if err:
+                return {"ok": False, "message": f"chord {index}: Invalid chord_llll — {err}"}
+            chords.append(chord_llll)
+        offset = f" {_as_float(offset_ms)}" if offset_ms is not None else ""
+        empty_voices = " []" * (_as_int(voice) - 1)
+        return _send_max_message(f"addchords{offset}{empty_voices} [{' '.join(chords)}]")
 
     @mcp.tool()
     def delete(
@@ -1948,18 +2643,17 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - delete(transferslots="auto")
           -> "delete @transferslots auto"
         """
-        parts = ["delete"]
-        if transferslots.strip():
-            parts.append(f"@transferslots {transferslots.strip()}")
-            if empty:
-                parts.append("@empty 1")
-        return _send_max_message(" ".join(parts))
+        transferslots = transferslots.strip()
+        if not transferslots:
+            return _send_max_message("delete")
+        empty_part = " @empty 1" if empty else ""
+        return _send_max_message(f"delete @transferslots {transferslots}{empty_part}")
 
     @mcp.tool()
     def deleteslotitem(
         slot: str,
         position: str,
-        thresh: float = float("nan"),
+        thresh: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Delete a specific item from a slot for selected notes in bach.roll.
 
@@ -1973,22 +2667,19 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
             - a wrapped X coordinate (e.g. "[0.7]" = delete item at X=0.7)
 
         - thresh: tolerance for X coordinate matching.
-                  Leave as nan to use exact matching (default).
+                  Leave as None to use exact matching (default).
 
         Examples (exact string sent to Max):
         - deleteslotitem("3", "2")              -> "deleteslotitem 3 2"
         - deleteslotitem("3", "[0.7]")          -> "deleteslotitem 3 [0.7]"
         - deleteslotitem("3", "[0.7]", thresh=0.1) -> "deleteslotitem 3 [0.7] @thresh 0.1"
         """
-        import math
         slot = slot.strip()
         position = position.strip()
         if not slot or not position:
-            return {"ok": False, "message": "slot and position cannot be empty"}
-        parts = ["deleteslotitem", slot, position]
-        if not math.isnan(thresh):
-            parts.append(f"@thresh {float(thresh)}")
-        return _send_max_message(" ".join(parts))
+            return _ERR_EMPTY_SLOT_OR_POSITION
+        thresh_part = f" @thresh {_as_float(thresh)}" if thresh is not None else ""
+        return _send_max_message(f"deleteslotitem {slot} {position}{thresh_part}")
 
     @mcp.tool()
     def distribute() -> Dict[str, Any]:
@@ -2024,7 +2715,7 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         this if there is already content you want to keep, or just to check
         the current state. It wipes everything and resets all layout settings.
 
-        Performs in sequence:
+        Sends these commands to Max in one write, in this order:
 
         1.  clear()            — removes all notes, chords, markers, and voices
         2.  numvoices(1)       — sets exactly one voice
@@ -2040,59 +2731,20 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         After calling this tool, always follow up with dump(mode="body") to
         confirm the score is in the expected clean state before adding content.
 
-        Returns a summary dict with the result of each step. If any step fails,
-        subsequent steps are still attempted so you get a full picture of what
-        succeeded and what did not.
+        Returns a summary dict with the command sent for each step. The steps
+        travel together, so they either all reach Max or none do.
         """
-        import time as _time_local
-
-        results: Dict[str, Any] = {}
-
-        _STEP_DELAY = 0.05  # seconds between each message
-
-        def _send_sequential(key: str, command: str) -> None:
-            results[key] = _send_max_message(command)
-            _time_local.sleep(_STEP_DELAY)
-
-        # 1. Clear all content
-        _send_sequential("clear", "clear")
-
-        # 2. Single voice
-        _send_sequential("numvoices", "numvoices 1")
-
-        # 3. Treble clef
-        _send_sequential("clefs", "clefs G")
-
-        # 4. Standard 5-line staff
-        _send_sequential("stafflines", "stafflines 5")
-
-        # 5. One part (voice 1 alone on its staff)
-        _send_sequential("numparts", "numparts 1")
-
-        # 6. White background
-        _send_sequential("bgcolor", "bgcolor 1.0 1.0 1.0 1.0")
-
-        # 7. Black notes
-        _send_sequential("notecolor", "notecolor 0.0 0.0 0.0 1.0")
-
-        # 8. Black staff lines
-        _send_sequential("staffcolor", "staffcolor 0.0 0.0 0.0 1.0")
-
-        # 9. No voice name label
-        _send_sequential("voicenames", "voicenames")
-
-        # 10. Default 10-second visible domain
-        _send_sequential("domain", "domain 10000.0")
-
-        all_ok = all(
-            (v.get("ok", False) if isinstance(v, dict) else bool(v))
-            for v in results.values()
-        )
+        result = _send_max_messages(_DEFAULT_SCORE_COMMANDS)
+        # One write carries every step, so they all share its outcome.
+        results = {
+            key: {"ok": result["ok"], "message": command}
+            for key, command in _DEFAULT_SCORE_STEPS
+        }
         return {
-            "ok": all_ok,
+            "ok": result["ok"],
             "message": (
-                "Default score initialised successfully." if all_ok
-                else "Default score initialised with one or more errors — check step results."
+                "Default score initialised successfully." if result["ok"]
+                else "Failed to send the default score commands to Max."
             ),
             "steps": results,
         }
@@ -2101,30 +2753,115 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
     # ── Memory & screenshot tools ─────────────────────────────────────────── #
     # File I/O helpers defined inline — no separate module needed.
 
-    import base64
-    import json as _json
-    import time as _time
-    from datetime import datetime, timezone
-    from pathlib import Path
-
     _assets_dir = Path(__file__).parent / "assets"
     _screenshots_dir = _assets_dir / "screenshots"
     _memory_path = _assets_dir / "memory.json"
+    # Set once both directories exist, so later calls skip the mkdir syscalls.
+    _dirs_ready = False
+
+    def _ensure_dirs() -> None:
+        nonlocal _dirs_ready
+        if _dirs_ready:
+            return
+        _screenshots_dir.mkdir(parents=True, exist_ok=True)
+        _dirs_ready = True
+
+    # memory.json is read once and then served from _memory_cache. A write goes
+    # to disk immediately, unless another one happened less than
+    # _MEMORY_FLUSH_DELAY_SECONDS ago: inside such a burst the update only marks
+    # the cache dirty and a debounce timer writes the file once. Pending updates
+    # are also flushed by project_memory_flush, the server's stop() and atexit.
+    _MEMORY_FLUSH_DELAY_SECONDS = 0.5
+    _memory_cache: Optional[Dict[str, Any]] = None
+    _memory_dirty = False
+    _memory_written_at = float("-inf")
+    _memory_flush_timer: Optional[threading.Timer] = None
+    _memory_lock = threading.RLock()
 
     def _load_memory() -> Dict[str, Any]:
-        _assets_dir.mkdir(exist_ok=True)
         if not _memory_path.exists():
             return {}
         try:
-            return _json.loads(_memory_path.read_text(encoding="utf-8"))
+            raw = _memory_path.read_bytes()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
         except Exception:
             return {}
 
     def _save_memory(data: Dict[str, Any]) -> None:
-        _assets_dir.mkdir(exist_ok=True)
-        _memory_path.write_text(
-            _json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8"
-        )
+        _ensure_dirs()
+        if orjson is not None:
+            # Same layout as the json fallback: 2-space indent, UTF-8 text unescaped.
+            blob = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            blob = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+        # Write a sibling file and swap it in, so a crash mid-write never leaves
+        # a truncated memory.json behind.
+        tmp_path = _memory_path.with_name(_memory_path.name + ".tmp")
+        try:
+            tmp_path.write_bytes(blob)
+            os.replace(tmp_path, _memory_path)
+        except OSError:
+            # The directory may have been removed since _ensure_dirs() ran, so
+            # recreate it and try the swap once more. memory.json itself is never
+            # written in place: with I/O already failing that could truncate it.
+            try:
+                _assets_dir.mkdir(exist_ok=True)
+                tmp_path.write_bytes(blob)
+                os.replace(tmp_path, _memory_path)
+            except OSError:
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                raise
+
+    def _memory() -> Dict[str, Any]:
+        """Return the cached memory, loading memory.json on first use. Caller holds _memory_lock."""
+        nonlocal _memory_cache
+        if _memory_cache is None:
+            _memory_cache = _load_memory()
+        return _memory_cache
+
+    def _flush_memory() -> bool:
+        """Write pending memory updates to disk. Returns True if a write happened.
+
+        Raises OSError if the write fails; the updates then stay pending.
+        """
+        nonlocal _memory_dirty, _memory_flush_timer, _memory_written_at
+        with _memory_lock:
+            if _memory_flush_timer is not None:
+                _memory_flush_timer.cancel()
+                _memory_flush_timer = None
+            if not _memory_dirty or _memory_cache is None:
+                return False
+            _save_memory(_memory_cache)
+            _memory_dirty = False
+            _memory_written_at = time.monotonic()
+            return True
+
+    def _flush_memory_logged() -> None:
+        # For the timer thread and shutdown paths, where no caller sees an exception.
+        try:
+            _flush_memory()
+        except Exception as exc:
+            _log(f"Failed to write project memory to {_memory_path}: {exc}")
+
+    def _schedule_memory_flush() -> None:
+        """Mark memory dirty and (re)start the debounce timer. Caller holds _memory_lock."""
+        nonlocal _memory_dirty, _memory_flush_timer
+        _memory_dirty = True
+        if _memory_flush_timer is not None:
+            _memory_flush_timer.cancel()
+        _memory_flush_timer = threading.Timer(_MEMORY_FLUSH_DELAY_SECONDS, _flush_memory_logged)
+        _memory_flush_timer.daemon = True
+        _memory_flush_timer.start()
+
+    # atexit does not run when the process is killed by a signal, so the
+    # server's stop() flushes too.
+    atexit.register(_flush_memory_logged)
+    add_shutdown_hook = getattr(bach, "add_shutdown_hook", None)
+    if add_shutdown_hook is not None:
+        add_shutdown_hook(_flush_memory_logged)
 
     @mcp.tool()
     def project_memory_read(project: str = "") -> Dict[str, Any]:
@@ -2135,15 +2872,16 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
 
         - project: project name to read. Leave empty to list all known projects.
         """
-        mem = _load_memory()
-        if not project.strip():
-            projects = {k: v.get("updated_at", "unknown") for k, v in mem.items()}
-            return {"ok": True, "projects": projects}
         key = project.strip()
-        if key not in mem:
-            return {"ok": True, "project": key, "memory": None,
-                    "note": "No memory found. Use project_memory_write to create it."}
-        return {"ok": True, "project": key, "memory": mem[key]}
+        with _memory_lock:
+            mem = _memory()
+            if not key:
+                projects = {k: v.get("updated_at", "unknown") for k, v in mem.items()}
+                return {"ok": True, "projects": projects}
+            if key not in mem:
+                return {"ok": True, "project": key, "memory": None,
+                        "note": "No memory found. Use project_memory_write to create it."}
+            return {"ok": True, "project": key, "memory": dict(mem[key])}
 
     @mcp.tool()
     def project_memory_write(
@@ -2155,6 +2893,10 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         """Write or update persistent memory for a project.
 
         Merges with existing memory — only fields you supply are updated.
+        If they already hold those values, nothing is rewritten. The file is
+        written at once ("saved": true); writes following each other within
+        half a second are coalesced and saved together shortly after the last
+        one ("saved": false).
         Call when the user states intentions, changes approach, or when
         you want to record something that should survive session restarts.
 
@@ -2163,21 +2905,58 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
         - workflow: current compositional approach or technique being used
         - notes:    observations, decisions, open questions, voice roles
         """
+        nonlocal _memory_dirty
         key = project.strip()
         if not key:
             return {"ok": False, "error": "project name cannot be empty"}
-        mem = _load_memory()
-        entry = mem.get(key, {})
-        if intent.strip():   entry["intent"]   = intent.strip()
-        if workflow.strip(): entry["workflow"]  = workflow.strip()
-        if notes.strip():    entry["notes"]     = notes.strip()
-        entry["updated_at"] = datetime.now(timezone.utc).isoformat()
-        mem[key] = entry
-        _save_memory(mem)
-        return {"ok": True, "project": key, "memory": entry}
+        intent, workflow, notes = intent.strip(), workflow.strip(), notes.strip()
+        with _memory_lock:
+            mem = _memory()
+            entry = mem.get(key, {})
+            if key in mem and all(
+                entry.get(field) == value
+                for field, value in (("intent", intent), ("workflow", workflow), ("notes", notes))
+                if value
+            ):
+                # Nothing would change: skip marking the file for a rewrite.
+                return {"ok": True, "project": key, "memory": dict(entry)}
+            if intent:   entry["intent"]   = intent
+            if workflow: entry["workflow"]  = workflow
+            if notes:    entry["notes"]     = notes
+            entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+            mem[key] = entry
+            if (
+                _memory_flush_timer is not None
+                or time.monotonic() - _memory_written_at < _MEMORY_FLUSH_DELAY_SECONDS
+            ):
+                # Part of a burst: coalesce with the writes around it.
+                _schedule_memory_flush()
+                return {"ok": True, "project": key, "memory": dict(entry), "saved": False}
+            _memory_dirty = True
+            try:
+                _flush_memory()
+            except OSError as exc:
+                # The update stays pending; the next flush retries it.
+                return {"ok": False, "error": f"Failed to write memory: {exc}"}
+            return {"ok": True, "project": key, "memory": dict(entry), "saved": True}
 
     @mcp.tool()
-    def score_snapshot() -> Dict[str, Any]:
+    def project_memory_flush() -> Dict[str, Any]:
+        """Write pending project memory to disk now.
+
+        project_memory_write defers saving only during bursts of writes; call
+        this when memory.json must be current immediately after such a burst.
+
+        Returns: ok, written (False when nothing was pending).
+        """
+        try:
+            written = _flush_memory()
+        except OSError as exc:
+            return {"ok": False, "error": f"Failed to write memory: {exc}"}
+        return {"ok": True, "written": written}
+
+    @mcp.tool()
+    async def score_snapshot() -> Dict[str, Any]:
         """Export the current score as a PNG and return it as a base64 image.
 
         Use when you are unsure whether the score looks correct — after several
@@ -2187,20 +2966,33 @@ def create_mcp_app(bach: BachMCPServer) -> FastMCP:
 
         Returns: ok, path, base64 (PNG for vision), timestamp.
         """
-        _assets_dir.mkdir(exist_ok=True)
-        _screenshots_dir.mkdir(exist_ok=True)
+        _ensure_dirs()
         ts  = datetime.now(timezone.utc)
         png = _screenshots_dir / f"score_{ts.strftime('%Y%m%d_%H%M%S')}.png"
-        if not bach.send_info(f"exportimage {png} @view line"):
+        # Like a query, the screenshot has to show everything queued so far.
+        if not _flush_command_batch() or not _send_info(f"exportimage {png} @view line"):
             return {"ok": False, "error": "Failed to send exportimage command to Max"}
-        deadline = _time.time() + 10.0
-        while _time.time() < deadline:
-            if png.exists() and png.stat().st_size > 0:
+        # Poll fast at first and back off towards 0.25 s: small scores render in
+        # tens of milliseconds. The size must hold still across two polls so a
+        # PNG Max is still writing is never read. Awaiting the backoff keeps the
+        # event loop free for other tools while Max renders.
+        deadline = time.monotonic() + 10.0
+        delay = 0.01
+        last_size = -1
+        while time.monotonic() < deadline:
+            size = png.stat().st_size if png.exists() else 0
+            if size > 0 and size == last_size:
                 break
-            _time.sleep(0.25)
+            last_size = size
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
         else:
             return {"ok": False, "error": "Score image not written within 10s — is bach.roll connected?"}
-        b64 = base64.b64encode(png.read_bytes()).decode("ascii")
+        if pybase64 is not None:
+            # Encodes straight to str, skipping the intermediate base64 bytes copy.
+            b64 = pybase64.b64encode_as_string(png.read_bytes())
+        else:
+            b64 = base64.b64encode(png.read_bytes()).decode("ascii")
         return {"ok": True, "path": str(png), "base64": b64, "timestamp": ts.isoformat()}
 
     return mcp
@@ -28,12 +28,27 @@ from mcp.server.fastmcp import FastMCP
 
 from .llm import ToolSpec
 
+try:  # optional: much faster encoding of large dump/score payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj: Any) -> str:
+    """json.dumps(obj, ensure_ascii=False), via orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass  # non-str keys, exotic types: let the stdlib have a go
+    return json.dumps(obj, ensure_ascii=False)
+
 
 def _json_safe(obj: Any) -> Any:
     """Strip values that are not valid JSON from a tool schema.
 
-    Several tools use float('nan') as a "not supplied" sentinel default, which
-    surfaces in the generated JSON Schema as `default: NaN`. NaN/Infinity are not
+    A tool using float('nan') as a "not supplied" sentinel default would surface
+    in the generated JSON Schema as `default: NaN`. NaN/Infinity are not
     JSON-compliant and break strict serializers, so we drop any such entry.
     Removing a `default: NaN` is harmless: the parameter stays optional and the
     real default is applied when the model omits it.
@@ -73,10 +88,10 @@ def _stringify_result(result: Any) -> str:
             return "\n".join(texts)
 
     if structured is not None:
-        return json.dumps(structured, ensure_ascii=False)
+        return _dumps(structured)
     if isinstance(blocks, dict):
-        return json.dumps(blocks, ensure_ascii=False)
-    return json.dumps({"ok": True}, ensure_ascii=False)
+        return _dumps(blocks)
+    return _dumps({"ok": True})
 
 
 class McpToolBridge:
@@ -107,9 +122,7 @@ class McpToolBridge:
                 self._mcp.call_tool(name, arguments or {})
             )
         except Exception as exc:  # ToolError, validation errors, transport errors, ...
-            return json.dumps(
-                {"error": f"{type(exc).__name__}: {exc}"}, ensure_ascii=False
-            )
+            return _dumps({"error": f"{type(exc).__name__}: {exc}"})
         return _stringify_result(result)
 
     def close(self) -> None:
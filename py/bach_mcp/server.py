@@ -2,19 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import os
 import signal
 import sys
 import threading
 import time
 from collections import deque
 from dataclasses import dataclass
-from typing import Any, Deque, Dict, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 try:
-    from .tcp import TCPSend, TCPServer
+    from .tcp import TCPQueuedSend, TCPSend, TCPServer
 except ImportError:
-    from tcp import TCPSend, TCPServer
+    from tcp import TCPQueuedSend, TCPSend, TCPServer
+
+
+# Message types a JSON envelope from Max may declare.
+_MESSAGE_TYPES = frozenset(("llll", "info"))
 
 
 def _log(message: str) -> None:
@@ -25,6 +31,11 @@ def _log(message: str) -> None:
         pass
 
 
+def _wake_waiter(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
 @dataclass
 class MCPConfig:
     """Runtime settings for the Bach MCP server."""
@@ -34,6 +45,27 @@ class MCPConfig:
     outgoing_host: str = "127.0.0.1"
     outgoing_port: int = 3000
     idle_sleep_seconds: float = 0.2
+    # Hand outgoing writes to a background sender thread. Tool calls stop waiting
+    # on the socket, but a send that fails once queued is only logged.
+    background_send: bool = False
+    # With background_send, how long the sender waits for more writes to join a
+    # batch. Each queued command may be delayed by up to this much.
+    batch_window_ms: float = 0.0
+    # Unix domain socket paths used instead of the host/port pairs above when
+    # Max runs on the same machine. The bachTCP.js bridge must be switched to the
+    # same paths (startServerOnSocket / reconnectToSocket).
+    incoming_socket_path: Optional[str] = None
+    outgoing_socket_path: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "MCPConfig":
+        """Build config from BACH_* environment variables, falling back to defaults."""
+        return cls(
+            background_send=os.getenv("BACH_BACKGROUND_SEND", "0") not in ("", "0"),
+            batch_window_ms=float(os.getenv("BACH_BATCH_WINDOW_MS") or 0.0),
+            incoming_socket_path=os.getenv("BACH_INCOMING_SOCKET") or None,
+            outgoing_socket_path=os.getenv("BACH_OUTGOING_SOCKET") or None,
+        )
 
 
 @dataclass
@@ -62,15 +94,30 @@ class BachMCPServer:
         self.server = TCPServer(
             host=self.config.incoming_host,
             port=self.config.incoming_port,
+            path=self.config.incoming_socket_path,
         )
-        self.sender = TCPSend(
-            host=self.config.outgoing_host,
-            port=self.config.outgoing_port,
-        )
+        if self.config.background_send:
+            self.sender = TCPQueuedSend(
+                host=self.config.outgoing_host,
+                port=self.config.outgoing_port,
+                batch_window=self.config.batch_window_ms / 1000.0,
+                path=self.config.outgoing_socket_path,
+            )
+        else:
+            self.sender = TCPSend(
+                host=self.config.outgoing_host,
+                port=self.config.outgoing_port,
+                path=self.config.outgoing_socket_path,
+            )
         self.running = False
         self._incoming_messages: Deque[BridgeMessage] = deque(maxlen=500)
         self._incoming_lock = threading.Lock()
-        self._incoming_event = threading.Event()
+        # Signalled on every append so waiters sleep until a message actually arrives.
+        self._incoming_ready = threading.Condition(self._incoming_lock)
+        # Futures of coroutines in wait_for_incoming_async, woken from the TCP thread.
+        self._incoming_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        # Callbacks run by stop(), e.g. to flush state the MCP tools buffer.
+        self._shutdown_hooks: List[Callable[[], None]] = []
 
     def start(self) -> None:
         """Start server and bind incoming message handler."""
@@ -84,12 +131,27 @@ class BachMCPServer:
         _log("=" * 50)
         _log("BACH MCP - Ready")
         _log("=" * 50)
-        _log(f"Incoming TCP: {self.config.incoming_host}:{self.config.incoming_port}")
-        _log(f"Outgoing TCP: {self.config.outgoing_host}:{self.config.outgoing_port}")
+        if self.config.incoming_socket_path:
+            _log(f"Incoming Unix socket: {self.config.incoming_socket_path}")
+        else:
+            _log(f"Incoming TCP: {self.config.incoming_host}:{self.config.incoming_port}")
+        if self.config.outgoing_socket_path:
+            _log(f"Outgoing Unix socket: {self.config.outgoing_socket_path}")
+        else:
+            _log(f"Outgoing TCP: {self.config.outgoing_host}:{self.config.outgoing_port}")
+
+    def add_shutdown_hook(self, hook: Callable[[], None]) -> None:
+        """Register a callback for stop() to run before the transport closes."""
+        self._shutdown_hooks.append(hook)
 
     def stop(self) -> None:
         """Graceful server shutdown."""
         self.running = False
+        for hook in self._shutdown_hooks:
+            try:
+                hook()
+            except Exception as exc:
+                _log(f"Shutdown hook failed: {exc}")
         if self.sender:
             self.sender.close()
         if self.server:
@@ -117,27 +179,14 @@ class BachMCPServer:
         """Send plain process message to Max."""
         return self.sender.send(message)
 
+    def send_info_batch(self, messages: List[str]) -> bool:
+        """Send several process messages to Max in one write, one per line."""
+        return self.sender.send_many(messages)
+
     def pop_next_incoming(self, message_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Pop oldest incoming message from Max, optionally filtered by type."""
         with self._incoming_lock:
-            if not self._incoming_messages:
-                self._incoming_event.clear()
-                return None
-            if message_type is None:
-                message = self._incoming_messages.popleft()
-                if not self._incoming_messages:
-                    self._incoming_event.clear()
-                return message.to_dict()
-
-            for index, message in enumerate(self._incoming_messages):
-                if message.type != message_type:
-                    continue
-                selected = self._incoming_messages[index]
-                del self._incoming_messages[index]
-                if not self._incoming_messages:
-                    self._incoming_event.clear()
-                return selected.to_dict()
-            return None
+            return self._pop_incoming_locked(message_type)
 
     def get_latest_incoming(self, message_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Return latest incoming message without consuming it."""
@@ -157,19 +206,44 @@ class BachMCPServer:
         message_type: Optional[str] = None,
     ) -> Optional[Dict[str, Any]]:
         """Wait for next incoming message from Max (consuming read)."""
-        deadline = time.time() + max(0.0, timeout_seconds)
+        deadline = time.monotonic() + max(0.0, timeout_seconds)
+        with self._incoming_ready:
+            while True:
+                message = self._pop_incoming_locked(message_type)
+                if message is not None:
+                    return message
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._incoming_ready.wait(timeout=remaining)
+
+    async def wait_for_incoming_async(
+        self,
+        timeout_seconds: float = 10.0,
+        message_type: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Awaitable wait_for_incoming: suspends the coroutine, not a thread, until a message arrives."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, timeout_seconds)
         while True:
-            message = self.pop_next_incoming(message_type=message_type)
-            if message is not None:
-                return message
-
-            remaining = deadline - time.time()
-            if remaining <= 0:
-                return None
-
-            has_data = self._incoming_event.wait(timeout=min(remaining, 0.25))
-            if not has_data and remaining <= 0:
-                return None
+            with self._incoming_lock:
+                message = self._pop_incoming_locked(message_type)
+                if message is not None:
+                    return message
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                waiter = loop.create_future()
+                self._incoming_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._incoming_lock:
+                    if (loop, waiter) in self._incoming_waiters:
+                        self._incoming_waiters.remove((loop, waiter))
 
     def incoming_queue_size(self) -> int:
         """Return number of queued incoming Max messages."""
@@ -186,7 +260,6 @@ class BachMCPServer:
         with self._incoming_lock:
             count = len(self._incoming_messages)
             self._incoming_messages.clear()
-            self._incoming_event.clear()
             return count
 
     def _install_signal_handlers(self) -> None:
@@ -197,6 +270,19 @@ class BachMCPServer:
         if hasattr(signal, "SIGTERM"):
             signal.signal(signal.SIGTERM, _handle_signal)
 
+    def _pop_incoming_locked(self, message_type: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Pop the oldest message of the given type; caller holds _incoming_lock."""
+        if not self._incoming_messages:
+            return None
+        if message_type is None:
+            return self._incoming_messages.popleft().to_dict()
+
+        for index, message in enumerate(self._incoming_messages):
+            if message.type == message_type:
+                del self._incoming_messages[index]
+                return message.to_dict()
+        return None
+
     def _handle_incoming_message(self, raw_message: str) -> None:
         text = raw_message.strip()
         if not text:
@@ -204,7 +290,13 @@ class BachMCPServer:
         parsed = self._parse_incoming(text)
         with self._incoming_lock:
             self._incoming_messages.append(parsed)
-            self._incoming_event.set()
+            self._incoming_ready.notify_all()
+            waiters, self._incoming_waiters = self._incoming_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake_waiter, waiter)
+            except RuntimeError:
+                pass  # the waiting loop has already been closed
         _log(f"Queued incoming Max message type={parsed.type}")
 
     def _parse_incoming(self, text: str) -> BridgeMessage:
@@ -218,8 +310,11 @@ class BachMCPServer:
             except json.JSONDecodeError:
                 parsed = None
             if isinstance(parsed, dict):
-                candidate_type = str(parsed.get("type") or "").strip().lower()
-                if candidate_type in {"llll", "info"}:
+                candidate_type = parsed.get("type")
+                if not isinstance(candidate_type, str) or candidate_type not in _MESSAGE_TYPES:
+                    # Only normalise types that are not already in canonical form.
+                    candidate_type = str(candidate_type or "").strip().lower()
+                if candidate_type in _MESSAGE_TYPES:
                     message_type = candidate_type
                     data = str(parsed.get("data", ""))
                 elif "message" in parsed:
@@ -235,10 +330,14 @@ class BachMCPServer:
 
     @staticmethod
     def _looks_like_llll(text: str) -> bool:
-        """Heuristic for raw llll strings, with optional selector prefix."""
-        stripped = text.strip()
-        if stripped.startswith("[") and stripped.endswith("]"):
+        """Heuristic for raw llll strings, with optional selector prefix.
+
+        Expects text already stripped, as _handle_incoming_message passes it.
+        """
+        if not text.endswith("]"):
+            return False
+        if text.startswith("["):
             return True
-        if stripped.lower().startswith("roll [") and stripped.endswith("]"):
+        if text[:6].lower() == "roll [":
             return True
         return False
@@ -1,6 +1,9 @@
 import socket
 import threading
+import queue
 import json
+import os
+import stat
 import sys
 import time
 
@@ -12,17 +15,53 @@ def _log(message):
         pass
 
 
+# Incoming messages longer than this are logged as a preview; dumps can run to megabytes.
+_LOG_PREVIEW_CHARS = 500
+
+
+def _one_line(message):
+    """Fold embedded newlines into spaces: Max splits incoming data into messages on newlines"""
+    return message.replace('\n', ' ') if '\n' in message else message
+
+
+def _frame(message):
+    """Encode one message as a newline-terminated UTF-8 frame; bytes pass through unencoded"""
+    if isinstance(message, (bytes, bytearray)):
+        return bytes(message).replace(b'\n', b' ') + b'\n'
+    if isinstance(message, dict):
+        message = json.dumps(message)
+    elif not isinstance(message, str):
+        message = str(message)
+    return (_one_line(message) + '\n').encode('utf-8')
+
+
 class TCPSend:
-    """TCP Client - Send messages to Node.js server on port 3000"""
-    def __init__(self, host="127.0.0.1", port=3000):
+    """TCP Client - Send messages to Node.js server on port 3000 (or a Unix socket at path)"""
+    def __init__(self, host="127.0.0.1", port=3000, path=None):
         self.host = host
         self.port = port
+        # Unix domain socket path; when set, host/port are ignored. Both ends
+        # must run on the same machine.
+        self.path = path
         self.socket = None
         self.connected = False
+        # One persistent connection shared by every caller; the lock keeps
+        # concurrent frames from interleaving and serializes reconnects.
+        self._lock = threading.Lock()
         self.connect()
     
     def connect(self):
         """Connect to TCP server"""
+        self._drop()
+        if self.path:
+            try:
+                self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.socket.connect(self.path)
+                self.connected = True
+                _log(f"Python client connected to {self.path}")
+            except Exception as e:
+                self.connected = False
+            return
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             # Disable Nagle's algorithm so every send() flushes immediately
@@ -35,42 +74,111 @@ class TCPSend:
         except Exception as e:
             self.connected = False
     
-    def send(self, message):
-        """Send message to server"""
-        if not self.connected:
+    def _drop(self):
+        """Close the current socket, if any, and mark the client disconnected"""
+        if self.socket:
             try:
-                self.connect()
-            except:
-                return False
-        
-        try:
-            if isinstance(message, dict):
-                message = json.dumps(message)
-            elif not isinstance(message, str):
-                message = str(message)
-            
-            self.socket.send((message + '\n').encode('utf-8'))
-            return True
-        except Exception as e:
-            self.connected = False
+                self.socket.close()
+            except Exception:
+                pass
+            self.socket = None
+        self.connected = False
+    
+    def _write(self, data):
+        """Write bytes on the persistent connection, reconnecting once if it went away"""
+        with self._lock:
+            for _ in range(2):
+                if not self.connected:
+                    self.connect()
+                    if not self.connected:
+                        return False
+                try:
+                    self.socket.sendall(data)
+                    return True
+                except Exception as e:
+                    # Max side closed or reset the connection: reopen and retry once.
+                    self._drop()
             return False
     
+    def send(self, message):
+        """Send message to server (str, dict as JSON, or already-encoded bytes)"""
+        return self._write(_frame(message))
+    
+    def send_many(self, messages):
+        """Send several messages in a single write, newline-framed as in send()"""
+        return self._write(b''.join(map(_frame, messages)))
+    
     def send_dict(self, data):
         """Send dictionary as JSON"""
         return self.send(json.dumps(data))
     
     def close(self):
         """Close connection"""
-        if self.socket:
-            self.socket.close()
-            self.connected = False
+        with self._lock:
+            self._drop()
+
+
+class TCPQueuedSend(TCPSend):
+    """TCP Client whose writes go out on a background thread, so callers never wait on the socket"""
+    MAX_BATCH = 64  # queued writes coalesced into one sendall()
+
+    def __init__(self, host="127.0.0.1", port=3000, batch_window=0.0, path=None):
+        self._queue = queue.SimpleQueue()
+        # Seconds to keep collecting after the first queued write, so a burst of
+        # small tool calls shares one sendall(); 0 sends whatever is already queued.
+        self.batch_window = batch_window
+        super().__init__(host, port, path)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+    
+    def send(self, message):
+        """Queue message for sending; returns once queued, failures are only logged"""
+        self._queue.put(_frame(message))
+        return True
+    
+    def send_many(self, messages):
+        """Queue several messages as one write, in order with everything else queued"""
+        self._queue.put(b''.join(map(_frame, messages)))
+        return True
+    
+    def _drain(self):
+        """Sender loop: write whatever is queued, up to MAX_BATCH items per sendall()"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+            chunks = [item]
+            deadline = time.monotonic() + self.batch_window
+            while len(chunks) < self.MAX_BATCH:
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                chunks.append(item)
+            if not self._write(b''.join(chunks)):
+                _log(f"Dropped {len(chunks)} queued write(s): Max is not reachable")
+    
+    def close(self):
+        """Send what is still queued, then close connection"""
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+        super().close()
 
 
 class TCPServer:
-    """TCP Server - Listen for connections from Max on port 3001"""
-    def __init__(self, host="127.0.0.1", port=3001):
+    """TCP Server - Listen for connections from Max on port 3001 (or a Unix socket at path)"""
+    def __init__(self, host="127.0.0.1", port=3001, path=None):
         self.host = host
         self.port = port
+        self.path = path
         self.server_socket = None
         self.running = False
         self.clients = []
@@ -93,16 +201,23 @@ class TCPServer:
     def _run_server(self):
         """Server loop"""
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
+            if self.path:
+                self._remove_stale_socket()
+                self.server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.server_socket.bind(self.path)
+            else:
+                self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.server_socket.bind((self.host, self.port))
             self.server_socket.listen(5)
             self.running = True
-            _log(f"Python server listening on {self.host}:{self.port}")
+            _log(f"Python server listening on {self.path or f'{self.host}:{self.port}'}")
             
             while self.running:
                 try:
                     client_socket, address = self.server_socket.accept()
+                    # Unix socket peers are unnamed; report the socket path instead.
+                    address = address or self.path
                     _log(f"Max client connected from {address}")
                     
                     # Handle client in separate thread
@@ -123,18 +238,37 @@ class TCPServer:
     
     def _handle_client(self, client_socket, address):
         """Handle individual client connection"""
+        # Max terminates every message with a newline, but a large dump spans
+        # many recv() calls. Keep the unterminated tail until its newline
+        # arrives so each message is decoded and queued exactly once, whole.
+        pending = bytearray()
         try:
             while self.running:
-                data = client_socket.recv(4096).decode('utf-8')
+                data = client_socket.recv(65536)
                 
                 if not data:
                     break
                 
-                # Process each message (split by newlines if present)
-                messages = data.strip().split('\n')
+                # Only the new chunk can hold a newline: the buffered tail has
+                # none, so searching all of it again would be quadratic in a dump.
+                start = len(pending)
+                pending += data
+                end = pending.rfind(b'\n', start)
+                if end < 0:
+                    continue
+                # Decode straight from the buffer: slicing the bytearray first
+                # would copy a multi-megabyte dump once more before decoding it.
+                with memoryview(pending)[:end] as view:
+                    messages = str(view, 'utf-8', 'replace').split('\n')
+                del pending[:end + 1]
                 for message in messages:
                     if message.strip():
                         self._process_message(message.strip(), address)
+            
+            # Connection closed: deliver a final message that lacked its newline
+            tail = pending.decode('utf-8', errors='replace').strip()
+            if tail:
+                self._process_message(tail, address)
         
         except Exception as e:
             pass
@@ -147,7 +281,10 @@ class TCPServer:
     
     def _process_message(self, message, address):
         """Process received message and route to handlers"""
-        _log(message)
+        if len(message) > _LOG_PREVIEW_CHARS:
+            _log(f"{message[:_LOG_PREVIEW_CHARS]}... ({len(message)} chars)")
+        else:
+            _log(message)
         
         # Try to parse as JSON
         try:
@@ -181,11 +318,21 @@ class TCPServer:
         for client in disconnected:
             self.clients.remove(client)
     
+    def _remove_stale_socket(self):
+        """Unlink a socket file left by an earlier run; bind() fails while it exists"""
+        try:
+            if stat.S_ISSOCK(os.stat(self.path).st_mode):
+                os.unlink(self.path)
+        except OSError:
+            pass
+    
     def stop(self):
         """Stop server"""
         self.running = False
         if self.server_socket:
             self.server_socket.close()
+        if self.path:
+            self._remove_stale_socket()
 
 
 # Example usage
@@ -17,6 +17,12 @@ Usage:
     python main.py serve --host 0.0.0.0 --port 9000   # bind for remote clients
     python main.py serve --stdio         # serve over stdio (host launches this process)
     python main.py agent                 # self-hosted REPL against an OpenAI-compatible provider
+    python main.py serve --incoming-socket /tmp/bach-in.sock --outgoing-socket /tmp/bach-out.sock
+                                         # talk to Max over Unix domain sockets instead of TCP
+
+The Max bridge settings (background sender and its batch window, Unix socket
+paths) can also come from BACH_* env
+vars (see MCPConfig.from_env); command-line flags take precedence.
 
 Both roles share the same core: BachMCPServer (TCP bridge to Max),
 create_mcp_app (the single tool definition), and BACH_SKILL.md.
@@ -26,11 +32,13 @@ from __future__ import annotations
 
 import argparse
 import os
+from typing import Optional
 
 from bach_mcp import (
     Agent,
     AgentConfig,
     BachMCPServer,
+    MCPConfig,
     McpToolBridge,
     ProviderConfig,
     build_provider,
@@ -45,7 +53,12 @@ def _read_skill() -> str:
         return f.read()
 
 
-def run_serve(stdio: bool = False, host: str = "127.0.0.1", port: int = 8000) -> None:
+def run_serve(
+    stdio: bool = False,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    config: Optional[MCPConfig] = None,
+) -> None:
     """Run the MCP server for an external MCP host (e.g. Claude Desktop).
 
     By default serves over streamable HTTP (a standalone, long-lived listener at
@@ -55,8 +68,11 @@ def run_serve(stdio: bool = False, host: str = "127.0.0.1", port: int = 8000) ->
 
     The skill doc is exposed as an MCP resource so the host can read it at the
     start of each session via read_resource("bach://skill").
+
+    config sets up the bridge to Max (ports or Unix socket paths); it defaults
+    to MCPConfig.from_env().
     """
-    bach = BachMCPServer()
+    bach = BachMCPServer(config or MCPConfig.from_env())
     bach.start()
     mcp = create_mcp_app(bach)
 
@@ -103,12 +119,13 @@ def run_serve(stdio: bool = False, host: str = "127.0.0.1", port: int = 8000) ->
         bach.stop()
 
 
-def run_agent() -> None:
+def run_agent(config: Optional[MCPConfig] = None) -> None:
     """Run the self-hosted agent REPL against an OpenAI-compatible provider.
 
     Provider/model/connection come from BACH_LLM_* env vars (see ProviderConfig).
     The skill doc is used directly as the system prompt — the same single source
-    of truth the serve path exposes as a resource.
+    of truth the serve path exposes as a resource. config sets up the bridge to
+    Max as in run_serve.
     """
     try:
         system_prompt = _read_skill()
@@ -121,7 +138,7 @@ def run_agent() -> None:
     provider_cfg = ProviderConfig.from_env()
     provider = build_provider(provider_cfg)
 
-    bach = BachMCPServer()
+    bach = BachMCPServer(config or MCPConfig.from_env())
     bach.start()
     mcp = create_mcp_app(bach)
     tools = McpToolBridge(mcp)
@@ -161,6 +178,20 @@ def run_agent() -> None:
         bach.stop()
 
 
+def _bach_config(args: argparse.Namespace) -> MCPConfig:
+    """MCPConfig from BACH_* env vars, overridden by any bridge flags given."""
+    config = MCPConfig.from_env()
+    if args.background_send:
+        config.background_send = True
+    if args.batch_window_ms is not None:
+        config.batch_window_ms = args.batch_window_ms
+    if args.incoming_socket:
+        config.incoming_socket_path = args.incoming_socket
+    if args.outgoing_socket:
+        config.outgoing_socket_path = args.outgoing_socket
+    return config
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         prog="bach",
@@ -193,12 +224,50 @@ def main() -> None:
         default=8000,
         help="HTTP port for serve (default: 8000).",
     )
+    parser.add_argument(
+        "--background-send",
+        action="store_true",
+        help=(
+            "hand writes to Max to a background sender thread, so tools do not wait "
+            "on the socket; a failed send is then only logged (env BACH_BACKGROUND_SEND=1)."
+        ),
+    )
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        metavar="MS",
+        help=(
+            "with --background-send, wait up to MS milliseconds for more writes to "
+            "join one batch (default: 0; env BACH_BATCH_WINDOW_MS)."
+        ),
+    )
+    parser.add_argument(
+        "--incoming-socket",
+        metavar="PATH",
+        help=(
+            "receive from Max on this Unix domain socket instead of TCP 3001 "
+            "(env BACH_INCOMING_SOCKET; send reconnectToSocket PATH to the Max bridge)."
+        ),
+    )
+    parser.add_argument(
+        "--outgoing-socket",
+        metavar="PATH",
+        help=(
+            "send to Max on this Unix domain socket instead of TCP 3000 "
+            "(env BACH_OUTGOING_SOCKET; send startServerOnSocket PATH to the Max bridge)."
+        ),
+    )
     args = parser.parse_args()
+    config = _bach_config(args)
+    if config.batch_window_ms < 0:
+        parser.error("--batch-window-ms must be >= 0")
+    if config.batch_window_ms and not config.background_send:
+        parser.error("--batch-window-ms only applies with --background-send (or BACH_BACKGROUND_SEND=1)")
 
     if args.mode == "agent":
-        run_agent()
+        run_agent(config)
     else:
-        run_serve(stdio=args.stdio, host=args.host, port=args.port)
+        run_serve(stdio=args.stdio, host=args.host, port=args.port, config=config)
 
 
 if __name__ == "__main__":
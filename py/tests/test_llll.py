@@ -0,0 +1,53 @@
+"""Tests for the llll validation and parsing helpers in bach_mcp.mcp_app."""
+
+import time
+
+from bach_mcp.mcp_app import _check_llll, _parse_llll, _parse_llll_ints
+
+
+def test_check_llll_accepts_balanced_scores():
+    assert _check_llll("roll [ [ 0. [ 6000. 673. 100 0 ] 0 ] 0 ]") is None
+    assert _check_llll("[é] [x] [p< f>]") is None
+    assert _check_llll("no brackets at all") is None
+
+
+def test_check_llll_reports_the_first_unexpected_close():
+    error = _check_llll("[1] ] [")
+    assert error is not None
+    assert "position 4" in error
+    assert "position 0" in _check_llll("] [")
+
+
+def test_check_llll_reports_unclosed_brackets():
+    assert "2 unclosed bracket(s)" in _check_llll("[ [")
+
+
+def test_check_llll_rejects_curly_braces():
+    assert "illegal character(s) found: '{', '}'" in _check_llll("[{}]")
+
+
+def test_check_llll_stays_linear_on_deep_nesting():
+    # A pass per nesting level would take tens of seconds at this depth.
+    depth = 200_000
+    balanced = "[" * depth + "1" + "]" * depth
+    started = time.perf_counter()
+    assert _check_llll(balanced) is None
+    assert "position" in _check_llll("]" + balanced + "[")
+    assert time.perf_counter() - started < 2.0
+
+
+def test_parse_llll_ints_keeps_structure_and_skips_symbols():
+    assert _parse_llll_ints("numnotes [3 4 2] [1 5]") == [[3, 4, 2], [1, 5]]
+    assert _parse_llll_ints("[1.5 -2 x3 7]") == [[7]]
+
+
+def test_parse_llll_ints_ignores_unbalanced_closers():
+    assert _parse_llll_ints("label [ [ 3 ] ] ] [1]") == [[[3]], [1]]
+
+
+def test_parse_llll_converts_numbers_and_keeps_symbols():
+    assert _parse_llll("roll [ [ 0. [ 6000. 500. 100 0 ] 0 ] ]") == [
+        "roll",
+        [[0.0, [6000.0, 500.0, 100, 0], 0]],
+    ]
+    assert _parse_llll('[ "a b" 1/8 C#4 -3 1e3 ] ]') == [["a b", "1/8", "C#4", -3, 1000.0]]
@@ -0,0 +1,222 @@
+"""Tool-level tests for bach_mcp.mcp_app, run against a fake Max bridge."""
+
+import asyncio
+import inspect
+import json
+import time
+
+import pytest
+
+from bach_mcp import mcp_app
+
+
+class FakeBridge:
+    """Stands in for BachMCPServer: records what is sent and replays queued replies."""
+
+    def __init__(self):
+        self.sent = []
+        self.writes = 0
+        self.replies = []
+        self.fail = False
+        self.shutdown_hooks = []
+
+    def send_info(self, message):
+        return self.send_info_batch([message])
+
+    def send_score(self, score_llll):
+        return self.send_info_batch([score_llll])
+
+    def send_info_batch(self, messages):
+        if self.fail:
+            return False
+        self.sent.extend(messages)
+        self.writes += 1
+        return True
+
+    async def wait_for_incoming_async(self, timeout_seconds=10.0, message_type=None):
+        if not self.replies:
+            return None
+        return {"data": self.replies.pop(0)}
+
+    def add_shutdown_hook(self, hook):
+        self.shutdown_hooks.append(hook)
+
+
+class App:
+    def __init__(self, bridge, mcp):
+        self.bridge = bridge
+        self.mcp = mcp
+
+    def call(self, name, *args, **kwargs):
+        result = self.mcp._tool_manager.get_tool(name).fn(*args, **kwargs)
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+        return result
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv("BACH_TOOL_LOG", "0")
+    # The assets directory (memory.json, screenshots) sits next to the module.
+    monkeypatch.setattr(mcp_app, "__file__", str(tmp_path / "mcp_app.py"))
+    bridge = FakeBridge()
+    return App(bridge, mcp_app.create_mcp_app(bridge))
+
+
+def _read_memory(tmp_path):
+    return json.loads((tmp_path / "assets" / "memory.json").read_text(encoding="utf-8"))
+
+
+# Count-query reply cache
+
+
+def test_count_query_is_served_from_cache(app):
+    app.bridge.replies.append("numvoices 2")
+    assert app.call("getnumvoices") == "numvoices 2"
+    assert app.call("getnumvoices") == "numvoices 2"
+    assert app.bridge.sent == ["getnumvoices"]
+
+
+def test_count_query_cache_expires(app):
+    app.bridge.replies += ["numvoices 2", "numvoices 3"]
+    app.call("getnumvoices")
+    time.sleep(0.25)
+    assert app.call("getnumvoices") == "numvoices 3"
+    assert app.bridge.sent == ["getnumvoices", "getnumvoices"]
+
+
+def test_sent_command_clears_count_cache(app):
+    app.bridge.replies += ["numvoices 2", "numvoices 3"]
+    app.call("getnumvoices")
+    app.call("numvoices", 3)
+    assert app.call("getnumvoices") == "numvoices 3"
+    assert app.bridge.sent == ["getnumvoices", "numvoices 3", "getnumvoices"]
+
+
+def test_layout_command_keeps_count_cache_but_drops_subroll_cache(app):
+    app.bridge.replies += ["numvoices 2", "roll [ ]", "roll [ [ 0 ] ]"]
+    app.call("getnumvoices")
+    app.call("subroll")
+    app.call("stafflines", "5")
+    assert app.call("getnumvoices") == "numvoices 2"
+    assert app.call("subroll") == "roll [ [ 0 ] ]"
+    assert app.bridge.sent == ["getnumvoices", "subroll [] []", "stafflines 5", "subroll [] []"]
+
+
+def test_subroll_replies_are_cached_per_command(app):
+    app.bridge.replies += ["roll [ 1 ]", "roll [ 2 ]"]
+    assert app.call("subroll", "[1]") == "roll [ 1 ]"
+    assert app.call("subroll", "[2]") == "roll [ 2 ]"
+    assert app.call("subroll_parsed", "[1]")["llll"] == ["roll", [1]]
+    assert len(app.bridge.sent) == 2
+
+
+def test_getnumnotes_parsed_unwraps_and_totals(app):
+    app.bridge.replies.append("numnotes [ [3 4 2] [1 5] ]")
+    result = app.call("getnumnotes_parsed")
+    assert result["counts"] == [[3, 4, 2], [1, 5]]
+    assert result["total"] == 15
+
+
+# Command batches
+
+
+def test_batch_sends_queued_commands_in_one_write(app):
+    app.call("begin_batch")
+    assert app.call("numvoices", 2)["message"] == "Queued: numvoices 2"
+    app.call("send_process_messages_to_max", ["ruler 1", "showpartcolors 1"])
+    assert app.bridge.sent == []
+    assert app.call("end_batch")["ok"]
+    assert app.bridge.sent == ["numvoices 2", "ruler 1", "showpartcolors 1"]
+    assert app.bridge.writes == 1
+    assert app.call("clefs", "G")["message"] == "clefs G"
+
+
+def test_query_flushes_open_batch_first(app):
+    app.bridge.replies.append("numvoices 2")
+    app.call("begin_batch")
+    app.call("numvoices", 2)
+    assert app.call("getnumvoices") == "numvoices 2"
+    assert app.bridge.sent == ["numvoices 2", "getnumvoices"]
+    assert app.call("end_batch")["message"] == "Command batch closed; nothing was queued"
+
+
+def test_failed_batch_send_keeps_commands_for_retry(app):
+    app.call("begin_batch")
+    app.call("numvoices", 2)
+    app.bridge.fail = True
+    assert not app.call("end_batch")["ok"]
+    assert not app.call("begin_batch")["ok"]
+    app.bridge.fail = False
+    assert app.call("end_batch")["message"] == "Sent 1 batched command(s) to Max"
+    assert app.bridge.sent == ["numvoices 2"]
+
+
+def test_full_batch_is_sent_early_and_stays_open(app):
+    app.call("begin_batch")
+    for index in range(mcp_app._COMMAND_BATCH_MAX):
+        app.call("send_process_message_to_max", f"activepart {index}")
+    assert len(app.bridge.sent) == mcp_app._COMMAND_BATCH_MAX
+    assert app.call("numvoices", 2)["message"] == "Queued: numvoices 2"
+    app.call("end_batch")
+    assert app.bridge.sent[-1] == "numvoices 2"
+
+
+def test_failed_early_send_only_rejects_the_new_command(app):
+    app.call("begin_batch")
+    for index in range(mcp_app._COMMAND_BATCH_MAX - 1):
+        app.call("send_process_message_to_max", f"activepart {index}")
+    app.bridge.fail = True
+    assert not app.call("numvoices", 2)["ok"]
+    app.bridge.fail = False
+    assert app.call("end_batch")["ok"]
+    assert len(app.bridge.sent) == mcp_app._COMMAND_BATCH_MAX - 1
+    assert "numvoices 2" not in app.bridge.sent
+
+
+def test_idle_batch_is_sent_and_closed(app, monkeypatch):
+    monkeypatch.setattr(mcp_app, "_COMMAND_BATCH_IDLE_SECONDS", 0.05)
+    app.call("begin_batch")
+    app.call("numvoices", 2)
+    deadline = time.monotonic() + 2.0
+    while not app.bridge.sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert app.bridge.sent == ["numvoices 2"]
+    assert app.call("clefs", "G")["message"] == "clefs G"
+    assert not app.call("end_batch")["ok"]
+
+
+# Project memory
+
+
+def test_memory_write_is_saved_at_once(app, tmp_path):
+    result = app.call("project_memory_write", "etude", intent="calm")
+    assert result["saved"]
+    assert _read_memory(tmp_path)["etude"]["intent"] == "calm"
+
+
+def test_memory_burst_is_coalesced_and_flushed(app, tmp_path):
+    app.call("project_memory_write", "etude", intent="calm")
+    result = app.call("project_memory_write", "etude", workflow="canon")
+    assert not result["saved"]
+    assert "workflow" not in _read_memory(tmp_path)["etude"]
+    assert app.call("project_memory_flush") == {"ok": True, "written": True}
+    assert _read_memory(tmp_path)["etude"]["workflow"] == "canon"
+    assert app.call("project_memory_flush") == {"ok": True, "written": False}
+
+
+def test_memory_burst_is_written_by_the_debounce_timer(app, tmp_path):
+    app.call("project_memory_write", "etude", intent="calm")
+    app.call("project_memory_write", "etude", notes="two voices")
+    deadline = time.monotonic() + 3.0
+    while "notes" not in _read_memory(tmp_path)["etude"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _read_memory(tmp_path)["etude"]["notes"] == "two voices"
+
+
+def test_server_shutdown_flushes_pending_memory(app, tmp_path):
+    app.call("project_memory_write", "etude", intent="calm")
+    app.call("project_memory_write", "etude", intent="stormy")
+    for hook in app.bridge.shutdown_hooks:
+        hook()
+    assert _read_memory(tmp_path)["etude"]["intent"] == "stormy"
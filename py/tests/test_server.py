@@ -0,0 +1,29 @@
+"""Tests for BachMCPServer configuration."""
+
+from bach_mcp.server import MCPConfig
+
+
+def test_config_from_env_defaults(monkeypatch):
+    monkeypatch.delenv("BACH_BACKGROUND_SEND", raising=False)
+    monkeypatch.delenv("BACH_BATCH_WINDOW_MS", raising=False)
+    monkeypatch.delenv("BACH_INCOMING_SOCKET", raising=False)
+    monkeypatch.delenv("BACH_OUTGOING_SOCKET", raising=False)
+    assert MCPConfig.from_env() == MCPConfig()
+
+
+def test_config_from_env_reads_socket_paths(monkeypatch):
+    monkeypatch.setenv("BACH_INCOMING_SOCKET", "/tmp/bach-in.sock")
+    monkeypatch.setenv("BACH_OUTGOING_SOCKET", "")
+    config = MCPConfig.from_env()
+    assert config.incoming_socket_path == "/tmp/bach-in.sock"
+    assert config.outgoing_socket_path is None
+
+
+def test_config_from_env_reads_background_send(monkeypatch):
+    monkeypatch.setenv("BACH_BACKGROUND_SEND", "1")
+    monkeypatch.setenv("BACH_BATCH_WINDOW_MS", "2.5")
+    config = MCPConfig.from_env()
+    assert config.background_send
+    assert config.batch_window_ms == 2.5
+    monkeypatch.setenv("BACH_BACKGROUND_SEND", "0")
+    assert not MCPConfig.from_env().background_send
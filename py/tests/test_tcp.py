@@ -0,0 +1,151 @@
+"""Loopback tests for the TCP and Unix domain socket transports in bach_mcp.tcp."""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from bach_mcp.tcp import TCPQueuedSend, TCPSend, TCPServer
+
+unix_only = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs AF_UNIX sockets")
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def socket_dir():
+    # Short prefix: AF_UNIX addresses are limited to about 100 bytes.
+    with tempfile.TemporaryDirectory(prefix="bach") as path:
+        yield path
+
+
+def _start_server(**kwargs):
+    received = []
+    server = TCPServer(**kwargs)
+    server.set_default_handler(received.append)
+    server.start()
+    assert _wait_for(lambda: server.running), "server did not start listening"
+    return server, received
+
+
+def test_tcp_loopback_delivers_framed_messages():
+    port = _free_port()
+    server, received = _start_server(port=port)
+    sender = TCPSend(port=port)
+    try:
+        assert sender.send("clefs G F")
+        assert sender.send_many(["numvoices 2", "stafflines 5"])
+        assert _wait_for(lambda: len(received) == 3)
+        assert received == ["clefs G F", "numvoices 2", "stafflines 5"]
+    finally:
+        sender.close()
+        server.stop()
+
+
+def test_tcp_server_reassembles_messages_split_across_reads():
+    port = _free_port()
+    server, received = _start_server(port=port)
+    big = "[" + " ".join(str(index) for index in range(200_000)) + "]"
+    payload = f"first\n{big}\nlast".encode("utf-8")
+    client = socket.create_connection(("127.0.0.1", port))
+    try:
+        for offset in range(0, len(payload), 10_000):
+            client.sendall(payload[offset:offset + 10_000])
+    finally:
+        client.close()
+    try:
+        assert _wait_for(lambda: len(received) == 3)
+        assert received == ["first", big, "last"]
+    finally:
+        server.stop()
+
+
+@unix_only
+def test_unix_socket_loopback_delivers_framed_messages(socket_dir):
+    path = os.path.join(socket_dir, "in.sock")
+    server, received = _start_server(path=path)
+    sender = TCPSend(path=path)
+    try:
+        assert sender.connected
+        assert sender.send("bgcolor 1 1 1 1")
+        assert sender.send_many(["[1 2]", "roll [ [ 0 ] ]"])
+        assert _wait_for(lambda: len(received) == 3)
+        assert received == ["bgcolor 1 1 1 1", "[1 2]", "roll [ [ 0 ] ]"]
+    finally:
+        sender.close()
+        server.stop()
+    assert not os.path.exists(path)
+
+
+@unix_only
+def test_unix_socket_server_replaces_stale_socket_file(socket_dir):
+    path = os.path.join(socket_dir, "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()  # leaves the socket file behind, as a crashed run would
+
+    server, received = _start_server(path=path)
+    sender = TCPSend(path=path)
+    try:
+        assert sender.send("clear")
+        assert _wait_for(lambda: received == ["clear"])
+    finally:
+        sender.close()
+        server.stop()
+
+
+@unix_only
+def test_queued_send_over_unix_socket_keeps_order(socket_dir):
+    path = os.path.join(socket_dir, "out.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    chunks = []
+
+    def read_all():
+        conn, _ = listener.accept()
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+
+    reader = threading.Thread(target=read_all, daemon=True)
+    reader.start()
+    sender = TCPQueuedSend(path=path, batch_window=0.002)
+    try:
+        for index in range(100):
+            sender.send(f"addmarker {index}. m{index}")
+    finally:
+        sender.close()
+    reader.join(timeout=2.0)
+    listener.close()
+    lines = b"".join(chunks).decode("utf-8").split("\n")
+    assert lines[:-1] == [f"addmarker {index}. m{index}" for index in range(100)]
+
+
+@unix_only
+def test_unix_socket_send_fails_cleanly_without_listener(socket_dir):
+    sender = TCPSend(path=os.path.join(socket_dir, "missing.sock"))
+    try:
+        assert not sender.connected
+        assert not sender.send("play")
+    finally:
+        sender.close()